@@ -0,0 +1,222 @@
+"""Persistent perceptual-hash index of every saved media image, finds re-downloads of the same photo"""
+
+import io
+import os
+import sqlite3
+import threading
+from contextlib import closing
+import numpy as np
+from PIL import Image
+from prefilter import dhash, hamming, MAX_DISTANCE as DHASH_DISTANCE
+
+MEDIA_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(MEDIA_DIR, "hash_index.db")
+DEFAULT_FOLDERS = [os.path.join(MEDIA_DIR, "images"), os.path.join(MEDIA_DIR, "batch_images")]
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+MAX_DISTANCE = 8  # pHash bits (of 64) two copies of a photo may differ by
+
+# DCT-II basis for 32x32 pHash
+_N = 32
+_DCT = np.cos(np.pi * (2 * np.arange(_N)[None, :] + 1) * np.arange(_N)[:, None] / (2 * _N))
+
+
+def phash(image):
+    """Returns 64-bit perceptual (DCT) hash of a PIL image, survives rescaling and recompression"""
+    pixels = np.asarray(image.convert("L").resize((_N, _N), Image.Resampling.LANCZOS), dtype=np.float64)
+    low = (_DCT @ pixels @ _DCT.T)[:8, :8]  # Lowest frequencies carry the structure
+    bits = (low > np.median(low)).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def image_hashes(content):
+    """Returns (phash, dhash) of image bytes"""
+    image = Image.open(io.BytesIO(content))
+    image.draft("RGB", (128, 128))  # JPEGs decode straight at reduced size
+    return phash(image), dhash(image)
+
+
+class MultiIndexHash:
+    """
+    Hamming-distance lookup over 64-bit hashes, split into chunks each with
+    its own table. Two hashes within max_distance agree to within
+    max_distance // chunks bits on at least one chunk, so a search only
+    probes those few neighbours per chunk instead of every entry
+
+    Example Usage:
+    hashes = MultiIndexHash(max_distance=8)
+    hashes.add(0xF0F0F0F0F0F0F0F0, "a.png")
+    hashes.search(0xF0F0F0F0F0F0F0F1)  # [(1, 'a.png')]
+    """
+
+    def __init__(self, max_distance=MAX_DISTANCE, chunks=4):
+        self.max_distance = max_distance
+        self.chunks = chunks
+        self.bits = 64 // chunks
+        self._mask = (1 << self.bits) - 1
+        self._tables = [{} for _ in range(chunks)]  # chunk value -> set of values
+        self._keys = {}  # value -> hash
+
+        # Every chunk-sized bit flip within the per-chunk radius
+        radius = max_distance // chunks
+        flips = {0}
+        for _ in range(radius):
+            flips |= {flip | (1 << bit) for flip in flips for bit in range(self.bits)}
+        self._flips = sorted(flips)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _split(self, key):
+        return [(key >> (i * self.bits)) & self._mask for i in range(self.chunks)]
+
+    def add(self, key, value):
+        self.remove(value)
+        self._keys[value] = key
+        for table, chunk in zip(self._tables, self._split(key)):
+            table.setdefault(chunk, set()).add(value)
+
+    def remove(self, value):
+        key = self._keys.pop(value, None)
+        if key is None:
+            return
+        for table, chunk in zip(self._tables, self._split(key)):
+            table[chunk].discard(value)
+            if not table[chunk]:
+                del table[chunk]
+
+    def search(self, key, max_distance=None):
+        """Returns (distance, value) of every entry within max_distance, closest first"""
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        candidates = set()
+        for table, chunk in zip(self._tables, self._split(key)):
+            for flip in self._flips:
+                candidates.update(table.get(chunk ^ flip, ()))
+        found = [(hamming(key, self._keys[value]), value) for value in candidates]
+        return sorted(item for item in found if item[0] <= max_distance)
+
+
+class HashIndex:
+    """
+    pHash and dHash of every image in the media folders, stored in SQLite
+    and searched through an in-memory multi-index hash table. The URL each
+    image was downloaded from is kept too, so it is never fetched again
+
+    Example Usage:
+    index = HashIndex()
+    index.scan()  # Hashes images added since the last scan
+    index.url_path(src)  # '/.../media/images/Alex Iwobi.png' if src was saved before, without downloading
+    index.find(content)  # ['/.../media/images/Alex Iwobi.png'] if already saved
+    index.add("media/images/Alex Iwobi.png", content, url=src)
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_distance=MAX_DISTANCE):
+        self.path = path
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS images ("
+                "path TEXT PRIMARY KEY, phash TEXT NOT NULL, dhash TEXT NOT NULL, "
+                "mtime REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, path TEXT NOT NULL)")
+            rows = conn.execute("SELECT path, phash, dhash, mtime, size FROM images").fetchall()
+            self._urls = dict(conn.execute("SELECT url, path FROM urls").fetchall())
+
+        # Hashes are 64-bit unsigned, stored as hex since SQLite integers are signed
+        self._entries = {path: (int(p, 16), int(d, 16), mtime, size) for path, p, d, mtime, size in rows}
+        self._hashes = MultiIndexHash(max_distance)
+        for path, (p, _, _, _) in self._entries.items():
+            self._hashes.add(p, path)
+
+    def _connect(self):
+        # New connection per operation, so the index can be shared across threads
+        return sqlite3.connect(self.path, timeout=30)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def find(self, content=None, hashes=None):
+        """Returns paths of indexed images that are the same photo, closest first"""
+        p, d = hashes or image_hashes(content)
+        with self._lock:
+            matches = self._hashes.search(p)
+            # dHash has to agree too, cuts pHash's rare false matches
+            return [path for _, path in matches if hamming(self._entries[path][1], d) <= DHASH_DISTANCE]
+
+    def url_path(self, url):
+        """Returns path of the indexed image downloaded from url, None if it was never saved or is gone"""
+        with self._lock:
+            path = self._urls.get(url)
+            return path if path in self._entries else None
+
+    def add(self, path, content=None, hashes=None, url=None):
+        """Indexes an image file (already written) and the URL it came from, returns its (phash, dhash)"""
+        path = os.path.abspath(path)
+        if hashes is None:
+            if content is None:
+                with open(path, "rb") as file:
+                    content = file.read()
+            hashes = image_hashes(content)
+        stat = os.stat(path)
+        self._store([(path, *hashes, stat.st_mtime, stat.st_size)])
+        if url is not None and url.startswith(("http://", "https://")):  # Not inline data: thumbnails
+            with closing(self._connect()) as conn, conn:
+                conn.execute("INSERT OR REPLACE INTO urls VALUES (?, ?)", (url, path))
+            with self._lock:
+                self._urls[url] = path
+        return hashes
+
+    def _store(self, entries):
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?)",
+                [(path, f"{p:016x}", f"{d:016x}", mtime, size) for path, p, d, mtime, size in entries]
+            )
+        with self._lock:
+            for path, p, d, mtime, size in entries:
+                self._entries[path] = (p, d, mtime, size)
+                self._hashes.add(p, path)
+
+    def scan(self, folders=DEFAULT_FOLDERS):
+        """Hashes new or changed images in the folders and forgets deleted ones, returns (added, removed)"""
+        seen = set()
+        changed = []
+        for folder in folders:
+            if not os.path.isdir(folder):
+                continue
+            for entry in os.scandir(folder):
+                if not entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                path = os.path.abspath(entry.path)
+                seen.add(path)
+                stat = entry.stat()
+                known = self._entries.get(path)
+                if known is not None and known[2:] == (stat.st_mtime, stat.st_size):
+                    continue  # Unchanged since it was hashed
+                try:
+                    with open(path, "rb") as file:
+                        changed.append((path, *image_hashes(file.read()), stat.st_mtime, stat.st_size))
+                except Exception as error:
+                    print(f"Skipped {entry.name}: {type(error).__name__}: {error}")
+
+        folders = [os.path.abspath(folder) for folder in folders]
+        removed = [path for path in self._entries
+                   if os.path.dirname(path) in folders and path not in seen]
+        if changed:
+            self._store(changed)
+        if removed:
+            self.remove(removed)
+        return len(changed), len(removed)
+
+    def remove(self, paths):
+        paths = [os.path.abspath(path) for path in paths]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("DELETE FROM images WHERE path = ?", [(path,) for path in paths])
+            conn.executemany("DELETE FROM urls WHERE path = ?", [(path,) for path in paths])
+        with self._lock:
+            for path in paths:
+                self._entries.pop(path, None)
+                self._hashes.remove(path)
+            removed = set(paths)
+            self._urls = {url: path for url, path in self._urls.items() if path not in removed}
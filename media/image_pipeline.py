@@ -0,0 +1,130 @@
+"""Staged image scraping: browsers harvest URLs, a thread pool downloads, one writer saves"""
+
+import queue
+import threading
+
+_DONE = object()  # Sentinel closing a queue
+
+
+def get_session(pool_size):
+    """Returns keep-alive session able to hold a connection per downloader"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_maxsize=pool_size))
+    session.mount("http://", HTTPAdapter(pool_maxsize=pool_size))
+    return session
+
+
+def download(session, limiter, src, timeout=10):
+    """Returns image bytes at src, None if the request failed or the content is invalid"""
+    import requests
+
+    try:
+        limiter.acquire()
+        response = session.get(src, timeout=timeout)
+        limiter.feedback(response.status_code)
+        response.raise_for_status()  # If failed request
+    except requests.exceptions.RequestException:
+        return None
+    if b"Access Denied" in response.content:
+        return None  # If content invalid
+    return response.content
+
+
+def run_pipeline(players, harvest, save, pool=None, browsers=None, downloaders=8, queue_size=32, known=None):
+    """
+    Runs harvest(browser, player, club) in browser workers, downloads every
+    image it finds and hands the bytes to save(item, content) in one writer
+    thread, returns the items save accepted in player order
+
+    harvest returns a list of dicts with at least "src" (image URL), each
+    gets "player", "order" (player's position) and "index" added. Queues
+    between the stages are bounded, so a slow stage holds back the faster
+    ones instead of piling up images in memory
+
+    known(item) is asked before each download: None downloads the image,
+    otherwise it is skipped and the answer says whether it counts as saved
+
+    Example Usage:
+    run_pipeline(players, media.harvest_image, media.save_image)
+    """
+    import shared
+
+    browser_pool = shared.load("browser_pool")
+    rate_limiter = shared.load("rate_limiter")
+
+    pool = pool or browser_pool.default_pool()
+    browsers = browsers or pool.size
+    limiter = rate_limiter.limiter("images")
+    session = get_session(downloaders)
+
+    players_queue = queue.Queue()
+    for order, (player, club) in enumerate(players):
+        players_queue.put((order, player, club))
+    urls = queue.Queue(maxsize=queue_size)
+    downloads = queue.Queue(maxsize=queue_size)
+    saved = []
+
+    # Stage 1: browsers only search and collect image URLs
+    def browser_worker():
+        while True:
+            try:
+                order, player, club = players_queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                with pool.browser() as browser:  # Per player, a crashed browser only loses one
+                    items = harvest(browser, player, club)
+            except Exception as error:
+                print(f"Failed to search images of {player}: {type(error).__name__}: {error}")
+                continue
+            for index, item in enumerate(items):
+                urls.put({**item, "player": player, "order": order, "index": index})
+
+    # Stage 2: downloads run concurrently over one pooled session
+    def download_worker():
+        while (item := urls.get()) is not _DONE:
+            try:  # Keeps consuming, a dead worker would leave its _DONE in urls and block the browsers
+                saved_before = known(item) if known is not None else None
+                if saved_before is not None:  # Never fetched again
+                    if saved_before:
+                        downloads.put((item, None))
+                    continue
+                content = download(session, limiter, item["src"])
+            except Exception as error:
+                print(f"Failed to download image of {item['player']}: {type(error).__name__}: {error}")
+                continue
+            if content is not None:
+                downloads.put((item, content))
+
+    # Stage 3: a single writer, so saving never races on file names
+    def writer():
+        while (entry := downloads.get()) is not _DONE:
+            item, content = entry
+            if content is None:  # Saved on an earlier run
+                saved.append(item)
+                continue
+            try:
+                if save(item, content):
+                    saved.append(item)
+            except Exception as error:
+                print(f"Failed to save image of {item['player']}: {type(error).__name__}: {error}")
+
+    browser_threads = [threading.Thread(target=browser_worker) for _ in range(browsers)]
+    download_threads = [threading.Thread(target=download_worker) for _ in range(downloaders)]
+    writer_thread = threading.Thread(target=writer)
+    for thread in browser_threads + download_threads + [writer_thread]:
+        thread.start()
+
+    for thread in browser_threads:
+        thread.join()
+    for _ in download_threads:
+        urls.put(_DONE)
+    for thread in download_threads:
+        thread.join()
+    downloads.put(_DONE)
+    writer_thread.join()
+
+    return sorted(saved, key=lambda item: (item["order"], item["index"]))
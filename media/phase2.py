@@ -1,188 +1,233 @@
-def get_batch_images(players):
-    """Fetches tons of images of given players in their club kits"""
-    from selenium import webdriver
+import queue
+import sys
+import threading
+
+
+def get_batch_images(players, pool=None, downloaders=8, classifier=None):
+    """
+    Fetches tons of images of given players in their club kits
+
+    In Jupyter, images that pass the prefilter are scored by the LLM in a
+    separate thread, batch_size images per request, so saving never waits
+    on the model
+    """
+    import hash_index
+    import image_pipeline
+    import prefilter
+
+    index = hash_index.HashIndex()
+    index.scan()  # Picks up images added or deleted by hand
+
+    # Obvious rejects (tiny, blurry, duplicate) never reach the disk or Gemini
+    candidates = prefilter.Prefilter()
+    # Already in the corpus, not downloaded or counted again
+    known = lambda item: False if index.url_path(item["src"]) else None
+
+    if "ipykernel" not in sys.modules:  # If in python script file, nothing to score
+        saved = image_pipeline.run_pipeline(players, harvest_images,
+                                            lambda item, content: save_batch_image(item, content, candidates, index),
+                                            pool, downloaders=downloaders, known=known)
+    else:
+        import tone
+
+        classifier = classifier or tone.default_classifier()
+        chunk_size = classifier.batch_size * classifier.max_workers
+        scoring = queue.Queue(maxsize=4 * chunk_size)
+        saved = []
+        scorer = threading.Thread(target=score_batch_images,
+                                  args=(scoring, candidates, index, classifier, chunk_size, saved))
+        scorer.start()
+        try:
+            image_pipeline.run_pipeline(players, harvest_images,
+                                        lambda item, content: queue_batch_image(item, content, candidates,
+                                                                                index, scoring),
+                                        pool, downloaders=downloaders, known=known)
+        finally:
+            scoring.put(None)  # Scores what is left, then stops
+            scorer.join()
+        saved.sort(key=lambda item: (item["order"], item["index"]))
+
+    print(f"Prefilter rejected {sum(candidates.rejected.values())} images: {dict(candidates.rejected)}")
+    return [(item["player"], item["source"]) for item in saved]
+
+
+def harvest_images(browser, player, club):
+    """Returns URL and source page of every large image Google finds for a player"""
     from selenium.webdriver.common.by import By
     from selenium.webdriver.common.keys import Keys
     from selenium.webdriver.support.wait import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.chrome.options import Options
     from selenium.common.exceptions import TimeoutException
-    import sys
-    import requests
-    import os
-    import time
-
-    # Configure for performance
-    options = Options()
-    options.add_argument("--headless=new")
-    browser = webdriver.Chrome(options=options)
-
-    # For each player search an image
-    sources = []  # Save sources in list
-    for player, club in players:
-        browser.get("https://www.google.com/imghp?hl=en")
-        
-        # Wait for search bar to load
-        search_player = WebDriverWait(browser, 10).until(
-            EC.presence_of_element_located((By.ID, "APjFqb"))
-        ) 
-        # Search player images (without Wikipedia entries)
-        search_player.send_keys(player + " " + club + " -wiki match")
-        search_player.send_keys(Keys.ENTER)
-        
-        try:  # Filter only large images
-            # Locate large images (higher quality)
-            WebDriverWait(browser, 10).until(
-                EC.element_to_be_clickable((By.ID, "hdtb-tls"))
-            ).click()  # Click tools
-            WebDriverWait(browser, 10).until(
-                EC.element_to_be_clickable((By.CLASS_NAME, "KTBKoe"))
-            ).click()  # Click size
-            large = WebDriverWait(browser, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.YpcDnf a"))
-            )
-            url = large.get_attribute("href")
-            browser.get(url)
-        except TimeoutException:
-            pass
 
-        try:  # In case no images found
-            WebDriverWait(browser, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "eA0Zlc"))
+    browser.get("https://www.google.com/imghp?hl=en")
+
+    # Wait for search bar to load
+    search_player = WebDriverWait(browser, 10).until(
+        EC.presence_of_element_located((By.ID, "APjFqb"))
+    ) 
+    # Search player images (without Wikipedia entries)
+    search_player.send_keys(player + " " + club + " -wiki match")
+    search_player.send_keys(Keys.ENTER)
+
+    try:  # Filter only large images
+        # Locate large images (higher quality)
+        WebDriverWait(browser, 10).until(
+            EC.element_to_be_clickable((By.ID, "hdtb-tls"))
+        ).click()  # Click tools
+        WebDriverWait(browser, 10).until(
+            EC.element_to_be_clickable((By.CLASS_NAME, "KTBKoe"))
+        ).click()  # Click size
+        large = WebDriverWait(browser, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "div.YpcDnf a"))
+        )
+        url = large.get_attribute("href")
+        browser.get(url)
+    except TimeoutException:
+        pass
+
+    try:  # In case no images found
+        WebDriverWait(browser, 10).until(
+            EC.presence_of_element_located((By.CLASS_NAME, "eA0Zlc"))
+        )
+    except TimeoutException:
+        return []
+
+    # Locate all images on page
+    pics = WebDriverWait(browser, 10).until(
+            EC.presence_of_all_elements_located((By.CLASS_NAME, "eA0Zlc"))
+    )
+
+    items = []
+    for pic in pics: 
+        try:
+            # Find higher quality version
+            pic.click()
+            image = WebDriverWait(browser, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ".p7sI2 img"))
             )
         except TimeoutException:
-             continue
-        
-        # Locate all images on page
-        pics = WebDriverWait(browser, 10).until(
-                EC.presence_of_all_elements_located((By.CLASS_NAME, "eA0Zlc"))
-        )
+            image = WebDriverWait(pic, 10).until(
+                EC.presence_of_element_located((By.TAG_NAME, "img"))
+            )
+        items.append({"src": image.get_attribute("src"), "source": pic.get_attribute("data-lpage")})
+    return items
 
-        # Process each image, keep if meets certain standards
-        for i, pic in enumerate(pics): 
-            try:
-                # Find higher quality version
-                pic.click()
-                image = WebDriverWait(browser, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".p7sI2 img"))
-                )
-            except TimeoutException:
-                # Download image
-                image = WebDriverWait(pic, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "img"))
-                )
-
-            src = image.get_attribute("src")
-
-            try:  # Request image and save to images folder
-                response = requests.get(src, timeout=10)
-                response.raise_for_status  # If failed request
-
-                if "Access Denied" in response.text:
-                    continue  # If content invalid 
-
-                if "ipykernel" in sys.modules:  # If in Jupyter
-                    fp = f"batch_images/{player}-{i}.png"
-                    with open(fp, "wb") as file:
-                        file.write(response.content)
-                    
-                    # Throw out image if too small (saves Gemini tokens too)
-                    if (os.path.getsize(fp) / 1024) < 50:  # If < 50kb
-                        os.remove(fp)
-                        time.sleep(5)
-                        continue
-
-                    # Determine the strength of tone and image quality
-                    response = mini_tone_detector(fp)
-                    tone = response.split(",")[0].strip()
-                    strength = int(response.split(",")[1].strip())
-                    quality = int(response.split(",")[2].strip())
-
-                    # Get rid of image if doesn't meet certain LLM standard
-                    if tone != "Neutral" and strength < 90:
-                        os.remove(fp)
-                        time.sleep(5)
-                        continue
-
-                    if quality < 90:
-                        os.remove(fp)
-                        time.sleep(5)
-                        continue
-
-                    # Rename image to reflect tone
-                    os.rename(fp,
-                              f"batch_images/{player}-{tone}-{i}.png")
-                    
-                else:  # If in python script file
-                    with open(f"media/batch_images/{player}-{i}.png", "wb") as file:
-                        file.write(response.content)
-
-            except requests.exceptions.RequestException:
-                continue
-            
-            # Save source
-            source = pic.get_attribute("data-lpage")
-            sources.append((player, source))
-
-            time.sleep(5)
-    
-    return sources
-
-
-def mini_tone_detector(image_path):
-    """Uses LLM to determine media tone of image"""
-    import google.generativeai as genai
-    import api_key
-    from PIL import Image
-
-    # Configure for image analysis
-    genai.configure(api_key=api_key.api_key)
-    model = genai.GenerativeModel("gemini-1.5-flash")
-
-    # Upload samples
-    sample_positive = "samples/iwobi-positive.png"
-    sample_negative = "samples/iwobi-negative.png"
-    sample_neutral = "samples/iwobi-neutral.png"
-
-    image = Image.open(image_path)
-
-    prompt = """
-    Respond with exactly 3 values separated by a comma:
-    tone, tone strength(0-100), image quality(0-100)).
-
-    The first three images are sample images. For the purposes of classification:
-    The first reflects a positive image,
-    The second reflects a negative image,
-    The third reflects a neutral image.
-
-    The final image is the image you are tasked with classifying on three criteria:
-    Tone, tone strength, image quality.
-
-    Tone:
-    Does the player in the final image reflect a positive, neutral, or negative media tone?
-    If the player is smiling or celebrating, the image is positive.
-    The image is negative if the player looks disappointed or frustrated.
-    Otherwise, the image is neutral (player has neutral expression).
-
-    Tone Strength:
-    Rank the previous classification on a scale of 0 to 100.
-    Scores closer to 0 means you are unsure and classified randomly.
-    Scores closer to 100 means the image closely resembles the given criteria for the tone.
-
-    Image Quality:
-    Scores closer to 0 means the image is grain, tiny, or very difficult to decipher.
-    Scores closer to 100 means the image is very large (many pixels) and of high quality.
-    Images of the player on the pitch are of higher quality. Images with a plain background are lower.
-    If the image has watermarks such as "Getty Images", the score is automatically 0.
-    Of the samples, note how the first two are of higher quality than the last.
-
-    Do not include new lines in any part of the response. It should be formatted as follows:
-    string, integer, integer
-    with the string being "Positive", "Neutral", or "Negative"
-    and the integer being from 0 to 100.
+
+def screen_batch_image(item, content, candidates, index=None):
+    """
+    Returns (dhash, (phash, dhash)) of a downloaded image that passes the
+    prefilter and isn't already saved (for any player), None otherwise
+    """
+    import hash_index
+
+    ok, _, image_hash = candidates.check(item["player"], content)
+    if not ok:
+        return None
+
+    # Same photo already in the corpus, don't store or score it again
+    hashes = hash_index.image_hashes(content)
+    if index is not None and index.find(hashes=hashes):
+        candidates.reject("already saved")
+        return None
+    return image_hash, hashes
+
+
+def save_batch_image(item, content, candidates, index=None, classifier=None):
     """
+    Saves a downloaded image if it passes the prefilter, isn't already
+    saved (for any player) and in Jupyter meets the LLM standard, returns
+    whether it was kept
+    """
+    import io
+    import tone
+
+    screened = screen_batch_image(item, content, candidates, index)
+    if screened is None:
+        return False
+
+    result = None
+    if "ipykernel" in sys.modules:  # If in Jupyter
+        # Determine the strength of tone and image quality, straight from memory
+        classifier = classifier or tone.default_classifier()
+        result = classifier.classify([io.BytesIO(content)])[0]
+    return write_batch_image(item, content, screened, candidates, index, result)
+
+
+def queue_batch_image(item, content, candidates, index, scoring):
+    """Hands an image that passes screening to the scorer, it is saved (or not) once scored"""
+    screened = screen_batch_image(item, content, candidates, index)
+    if screened is not None:
+        scoring.put((item, content, screened))
+    return False  # Counted as saved by the scorer
+
+
+def score_batch_images(scoring, candidates, index, classifier, chunk_size, saved):
+    """
+    Scores queued images chunk_size at a time (batch_size per request) and
+    saves those meeting the LLM standard into saved, until None is queued
+    """
+    import io
+
+    done = False
+    while not done:
+        chunk = []
+        while len(chunk) < chunk_size:
+            if (entry := scoring.get()) is None:
+                done = True
+                break
+            chunk.append(entry)
+        if not chunk:
+            continue
+
+        try:
+            results = classifier.classify([io.BytesIO(content) for _, content, _ in chunk])
+        except Exception as error:
+            print(f"Failed to score {len(chunk)} images: {type(error).__name__}: {error}")
+            continue
+        for (item, content, screened), result in zip(chunk, results):
+            try:
+                if write_batch_image(item, content, screened, candidates, index, result):
+                    saved.append(item)
+            except Exception as error:
+                print(f"Failed to save image of {item['player']}: {type(error).__name__}: {error}")
+
+
+def write_batch_image(item, content, screened, candidates, index=None, result=None):
+    """Writes a screened image, in Jupyter only if its LLM result meets the standard"""
+    player, i = item["player"], item["index"]
+    image_hash, hashes = screened
+
+    if result is not None:  # If in Jupyter
+        # Get rid of image if doesn't meet certain LLM standard
+        if result["tone"] != "Neutral" and result["strength"] < 90:
+            return False
+
+        if result["quality"] < 90:
+            return False
+
+        # Near-duplicate of an image kept while this one waited for its score
+        if candidates.duplicate(player, image_hash):
+            candidates.reject("duplicate")
+            return False
+
+        # Name image to reflect tone
+        path = f"batch_images/{player}-{result['tone']}-{i}.png"
+
+    else:  # If in python script file
+        path = f"media/batch_images/{player}-{i}.png"
+
+    with open(path, "wb") as file:
+        file.write(content)
+    candidates.keep(player, image_hash)  # Only now, an image the LLM turned down doesn't block others
+    if index is not None:
+        index.add(path, hashes=hashes, url=item["src"])
+    return True
 
-    response = model.generate_content([prompt, sample_positive, sample_negative, sample_neutral, image])
 
-    return response.text.replace("\n", "")
+def mini_tone_detector(image_path, classifier=None):
+    """Uses LLM to determine media tone of image (a path or file object)"""
+    import tone
 
+    # Shared classifier, model is configured and samples uploaded only once
+    classifier = classifier or tone.default_classifier()
+    return tone.format_result(classifier.classify([image_path])[0])
@@ -0,0 +1,116 @@
+"""Cheap in-memory checks that reject unusable images before they are saved or sent to Gemini"""
+
+import io
+import threading
+from collections import Counter
+import numpy as np
+from PIL import Image
+
+MIN_BYTES = 50 * 1024  # Smaller files are thumbnails
+MIN_SIDE = 400  # Pixels, shortest side
+MAX_ASPECT = 2.0  # Longest side / shortest side, rejects banners and strips
+MIN_SHARPNESS = 50.0  # Variance of the Laplacian at SHARPNESS_SIZE, lower is blurry
+SHARPNESS_SIZE = 256
+MAX_DISTANCE = 10  # Hamming distance (of 64 bits) under which two images are the same photo
+
+
+def dhash(image, size=8):
+    """Returns 64-bit difference hash of a PIL image, similar images differ in few bits"""
+    pixels = np.asarray(image.convert("L").resize((size + 1, size), Image.Resampling.BILINEAR), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def sharpness(image):
+    """Returns variance of the Laplacian of a downscaled grayscale image"""
+    gray = image.convert("L")
+    gray.thumbnail((SHARPNESS_SIZE, SHARPNESS_SIZE))
+    pixels = np.asarray(gray, dtype=np.float32)
+    laplacian = (pixels[:-2, 1:-1] + pixels[2:, 1:-1] + pixels[1:-1, :-2] + pixels[1:-1, 2:]
+                 - 4 * pixels[1:-1, 1:-1])
+    return float(laplacian.var())
+
+
+class Prefilter:
+    """
+    Judges downloaded image bytes cheapest check first: file size, pixel
+    dimensions and aspect ratio (header only), then sharpness and
+    near-duplicates of images already kept for the same player
+    (decoding a reduced-size copy)
+
+    Example Usage:
+    candidates = Prefilter()
+    ok, reason, image_hash = candidates.check("Alex Iwobi", content)
+    if ok and save(content):
+        candidates.keep("Alex Iwobi", image_hash)  # Later copies are duplicates
+    candidates.rejected  # Counter({'too small': 12, 'duplicate': 4, ...})
+    """
+
+    def __init__(self, min_bytes=MIN_BYTES, min_side=MIN_SIDE, max_aspect=MAX_ASPECT,
+                 min_sharpness=MIN_SHARPNESS, max_distance=MAX_DISTANCE):
+        self.min_bytes = min_bytes
+        self.min_side = min_side
+        self.max_aspect = max_aspect
+        self.min_sharpness = min_sharpness
+        self.max_distance = max_distance
+        self.hashes = {}  # player -> dhashes of images that were kept
+        self.rejected = Counter()
+        self._lock = threading.Lock()  # Checked by the pipeline's writer while a scorer keeps images
+
+    def check(self, player, content):
+        """
+        Returns (True, None, dhash) if image is worth scoring, else
+        (False, reason, None). Nothing is recorded, call keep once the image
+        is actually saved
+        """
+        reason, image_hash = self._reason(player, content)
+        if reason is not None:
+            self.reject(reason)
+            return False, reason, None
+        return True, None, image_hash
+
+    def reject(self, reason):
+        """Counts an image turned down for a reason found outside check"""
+        with self._lock:
+            self.rejected[reason] += 1
+
+    def duplicate(self, player, image_hash):
+        """Returns whether an image is a near-duplicate of one already kept for the player"""
+        with self._lock:
+            kept = list(self.hashes.get(player, []))
+        return any(hamming(image_hash, other) <= self.max_distance for other in kept)
+
+    def keep(self, player, image_hash):
+        """Records a saved image, so near-duplicates of it are rejected from now on"""
+        with self._lock:
+            self.hashes.setdefault(player, []).append(image_hash)
+
+    def _reason(self, player, content):
+        if len(content) < self.min_bytes:
+            return "too small", None
+
+        try:
+            image = Image.open(io.BytesIO(content))  # Only parses the header
+        except Exception:
+            return "not an image", None
+        width, height = image.size
+        if min(width, height) < self.min_side:
+            return "low resolution", None
+        if max(width, height) / min(width, height) > self.max_aspect:
+            return "aspect ratio", None
+
+        try:
+            image.draft("RGB", (SHARPNESS_SIZE, SHARPNESS_SIZE))  # JPEGs decode straight at reduced size
+            if sharpness(image) < self.min_sharpness:
+                return "blurry", None
+            image_hash = dhash(image)
+        except Exception:
+            return "not an image", None  # Truncated or corrupt data
+
+        if self.duplicate(player, image_hash):
+            return "duplicate", None
+        return None, image_hash
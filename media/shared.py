@@ -0,0 +1,33 @@
+"""Loads the scraping helpers (browser pool, rate limiter) that live with the shotmap code"""
+
+import importlib.util
+import os
+import sys
+import threading
+
+SHOTMAP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "shotmap")
+
+_lock = threading.Lock()
+
+
+def load(name):
+    """
+    Returns shotmap/<name>.py as a module, loaded once and registered under
+    its own name, so both folders share one instance (and its singletons)
+    without either going on sys.path
+
+    Example Usage:
+    rate_limiter = shared.load("rate_limiter")
+    """
+    with _lock:
+        module = sys.modules.get(name)
+        if module is None:
+            spec = importlib.util.spec_from_file_location(name, os.path.join(SHOTMAP_DIR, f"{name}.py"))
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[name] = module
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                del sys.modules[name]
+                raise
+    return module
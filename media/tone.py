@@ -0,0 +1,234 @@
+"""Batched LLM media tone classification, several images per request"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples")
+SAMPLES = ["iwobi-positive.png", "iwobi-negative.png", "iwobi-neutral.png"]
+TONES = ("Positive", "Neutral", "Negative")
+PROMPT_VERSION = 1  # Bump whenever PROMPT changes, cached results of older prompts are ignored
+
+# Shared by both detectors. Worded like mini_tone_detector's old prompt, so
+# tone_detector's quality criterion now asks for "very large (many pixels)"
+# images where it used to say "large"
+PROMPT = """
+The first three images are sample images. For the purposes of classification:
+The first reflects a positive image,
+The second reflects a negative image,
+The third reflects a neutral image.
+
+Every image after the samples is labelled "Image N". Classify each of them on three criteria:
+Tone, tone strength, image quality.
+
+Tone:
+Does the player in the image reflect a positive, neutral, or negative media tone?
+If the player is smiling or celebrating, the image is positive.
+The image is negative if the player looks disappointed or frustrated.
+Otherwise, the image is neutral (player has neutral expression).
+
+Tone Strength:
+Rank the previous classification on a scale of 0 to 100.
+Scores closer to 0 means you are unsure and classified randomly.
+Scores closer to 100 means the image closely resembles the given criteria for the tone.
+
+Image Quality:
+Scores closer to 0 means the image is grain, tiny, or very difficult to decipher.
+Scores closer to 100 means the image is very large (many pixels) and of high quality.
+Images of the player on the pitch are of higher quality. Images with a plain background are lower.
+If the image has watermarks such as "Getty Images", the score is automatically 0.
+Of the samples, note how the first two are of higher quality than the last.
+
+Respond with a JSON array holding one object per labelled image, in order:
+[{"image": 1, "tone": "Positive", "strength": 85, "quality": 90}, ...]
+with tone being "Positive", "Neutral", or "Negative"
+and strength and quality being integers from 0 to 100.
+"""
+
+
+class GeminiModel:
+    """Gemini client configured once, asks for JSON responses"""
+
+    def __init__(self, model_name="gemini-1.5-flash"):
+        import google.generativeai as genai
+        from google.api_core import exceptions
+        import api_key
+
+        genai.configure(api_key=api_key.api_key)
+        self.name = model_name
+        self._genai = genai
+        self._model = genai.GenerativeModel(
+            model_name, generation_config={"response_mime_type": "application/json"}
+        )
+        self.retry_on = (exceptions.ResourceExhausted, exceptions.ServiceUnavailable, exceptions.InternalServerError)
+
+    def upload(self, path):
+        """Uploads a reference image once, later requests only send its handle"""
+        return self._genai.upload_file(path)
+
+    def generate(self, parts):
+        return self._model.generate_content(parts).text
+
+
+class MockModel:
+    """
+    Offline stand-in for GeminiModel, answers every labelled image with the
+    same scores and counts requests and images sent
+
+    Example Usage:
+    classifier = ToneClassifier(MockModel(tone="Positive", strength=95))
+    """
+
+    name = "mock"
+    retry_on = ()
+
+    def __init__(self, tone="Neutral", strength=95, quality=95):
+        self.tone = tone
+        self.strength = strength
+        self.quality = quality
+        self.requests = 0
+        self.images = 0
+        self.uploads = 0
+        self._lock = threading.Lock()
+
+    def upload(self, path):
+        with self._lock:
+            self.uploads += 1
+        return path
+
+    def generate(self, parts):
+        labels = [part for part in parts if isinstance(part, str) and part.startswith("Image ")]
+        with self._lock:
+            self.requests += 1
+            self.images += len(labels)
+        return json.dumps([
+            {"image": int(label.split()[1].rstrip(":")), "tone": self.tone,
+             "strength": self.strength, "quality": self.quality}
+            for label in labels
+        ])
+
+
+def parse_results(text, count):
+    """Returns count result dicts (tone, strength, quality) from a JSON response, in image order"""
+    text = text.strip()
+    if text.startswith("```"):  # Fenced despite asking for JSON
+        text = text.strip("`").removeprefix("json").strip()
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get("results", [data])
+
+    by_image = {int(result["image"]): result for result in data}
+    results = []
+    for i in range(1, count + 1):
+        result = by_image[i]  # KeyError if the model skipped an image
+        tone = str(result["tone"]).strip().capitalize()
+        if tone not in TONES:
+            raise ValueError(f"Unknown tone: {result['tone']}")
+        results.append({"tone": tone, "strength": int(result["strength"]), "quality": int(result["quality"])})
+    return results
+
+
+def image_bytes(image):
+    """Returns raw bytes of an image given as a path, file object or PIL image"""
+    from PIL import Image
+
+    if isinstance(image, Image.Image):
+        return f"{image.mode}{image.size}".encode() + image.tobytes()
+    if hasattr(image, "read"):
+        position = image.tell()
+        content = image.read()
+        image.seek(position)
+        return content
+    with open(image, "rb") as file:
+        return file.read()
+
+
+def format_result(result):
+    """Returns result in the detectors' original 'Tone, strength, quality' format"""
+    return f"{result['tone']}, {result['strength']}, {result['quality']}"
+
+
+class ToneClassifier:
+    """
+    Classifies media tone, strength and image quality of many images, packing
+    batch_size images into each request behind one copy of the prompt and
+    the reference samples (uploaded once), with up to max_workers requests
+    in flight. With a cache, images already classified under the same
+    prompt version and model are never sent again
+
+    Example Usage:
+    classifier = ToneClassifier()
+    classifier.classify(["images/Alex Iwobi.png", "images/Kyle Walker.png"])
+    # [{'tone': 'Positive', 'strength': 85, 'quality': 90}, ...]
+    """
+
+    def __init__(self, model=None, batch_size=5, max_workers=2, cache=None, limiter=None):
+        import shared
+
+        rate_limiter = shared.load("rate_limiter")
+        self.model = model or GeminiModel()
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.cache = cache
+        self.limiter = limiter or rate_limiter.limiter("gemini")
+        self.samples = [self.model.upload(os.path.join(SAMPLES_DIR, sample)) for sample in SAMPLES]
+
+    def classify(self, images):
+        """Returns one result dict per image (path, file object or PIL image), in order"""
+        if self.cache is None:
+            return self._classify(images)
+
+        # Content-addressed, the same image under any name is classified once
+        contents = [image_bytes(image) for image in images]
+        digests = [hashlib.sha256(content).hexdigest() for content in contents]
+        results = self.cache.get_many(digests, PROMPT_VERSION, self.model.name)
+
+        missing = {digest: content for digest, content in zip(digests, contents) if digest not in results}
+        if missing:
+            new = dict(zip(missing, self._classify([io.BytesIO(content) for content in missing.values()])))
+            self.cache.put_many(new, PROMPT_VERSION, self.model.name)
+            results.update(new)
+        return [results[digest] for digest in digests]
+
+    def _classify(self, images):
+        batches = [images[i:i + self.batch_size] for i in range(0, len(images), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return [result for batch in executor.map(self._classify_batch, batches) for result in batch]
+
+    def _classify_batch(self, images):
+        from PIL import Image
+
+        parts = [PROMPT, *self.samples]
+        for i, image in enumerate(images, start=1):
+            parts += [f"Image {i}:", image if isinstance(image, Image.Image) else Image.open(image)]
+
+        # Limiter (the shared gemini one by default) paces requests and backs off on quota errors
+        text = self.limiter.call(self.model.generate, parts, retry_on=self.model.retry_on)
+        try:
+            return parse_results(text, len(images))
+        except (ValueError, KeyError, TypeError):
+            if len(images) == 1:
+                raise
+            # Malformed batch answer, ask again one image at a time
+            return [result for image in images for result in self._classify_batch([image])]
+
+
+_default_classifier = None
+_default_lock = threading.Lock()
+
+
+def default_classifier():
+    """
+    Returns the process-wide classifier, so the model is configured and
+    samples uploaded once, and results are cached on disk
+    """
+    import tone_cache
+
+    global _default_classifier
+    with _default_lock:
+        if _default_classifier is None:
+            _default_classifier = ToneClassifier(cache=tone_cache.ToneCache())
+    return _default_classifier
@@ -0,0 +1,64 @@
+"""Persistent cache of tone results keyed by image content, prompt version and model"""
+
+import os
+import sqlite3
+from contextlib import closing
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tone_cache.db")
+
+
+class ToneCache:
+    """
+    Parsed tone results by (SHA-256 of the image bytes, prompt version, model
+    name), so a renamed or re-downloaded image is never classified twice and
+    changing the prompt or model starts afresh
+
+    Example Usage:
+    cache = ToneCache()
+    cache.put_many({digest: {"tone": "Positive", "strength": 85, "quality": 90}}, 1, "gemini-1.5-flash")
+    cache.get_many([digest], 1, "gemini-1.5-flash")  # {digest: {'tone': 'Positive', ...}}
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tones ("
+                "sha256 TEXT NOT NULL, prompt_version INTEGER NOT NULL, model TEXT NOT NULL, "
+                "tone TEXT NOT NULL, strength INTEGER NOT NULL, quality INTEGER NOT NULL, "
+                "PRIMARY KEY (sha256, prompt_version, model))"
+            )
+
+    def _connect(self):
+        # New connection per operation, so the cache can be shared across threads
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_many(self, digests, prompt_version, model):
+        """Returns {digest: result} for the digests already classified"""
+        digests = list(dict.fromkeys(digests))
+        found = {}
+        with closing(self._connect()) as conn:
+            for i in range(0, len(digests), 500):  # Stay under SQLite's variable limit
+                chunk = digests[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT sha256, tone, strength, quality FROM tones "
+                    f"WHERE prompt_version = ? AND model = ? AND sha256 IN ({', '.join('?' * len(chunk))})",
+                    (prompt_version, model, *chunk)
+                ).fetchall()
+                found.update({digest: {"tone": tone, "strength": strength, "quality": quality}
+                              for digest, tone, strength, quality in rows})
+        return found
+
+    def put_many(self, results, prompt_version, model):
+        """Stores {digest: result} in one transaction"""
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO tones VALUES (?, ?, ?, ?, ?, ?)",
+                [(digest, prompt_version, model, result["tone"], result["strength"], result["quality"])
+                 for digest, result in results.items()]
+            )
+        return len(results)
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM tones")
@@ -0,0 +1,159 @@
+"""Batch shotmap generation for a list of players or a whole team"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+
+def team_jobs(team_id, competition_name):
+    """
+    Returns a (player_name, competition_name) job for every player in a SofaScore team
+
+    Player IDs come with the squad list, so they are stored in the player index
+    and never need a browser lookup
+    """
+    import sofascore
+    import player_index
+
+    response = sofascore.get(f"/team/{team_id}/players", ttl=sofascore.EVENTS_TTL)
+    response.raise_for_status()
+    players = [entry["player"] for entry in response.json()["players"]]
+    player_index.PlayerIndex().add_many([(player["name"], player["id"]) for player in players])
+    return [(player["name"], competition_name) for player in players]
+
+
+def output_path(output_dir, player_name, competition_name, fmt):
+    """Returns file path for a shotmap, e.g. 'out/Mohamed Salah - Premier League 24-25.png'"""
+    return os.path.join(output_dir, f"{player_name} - {competition_name.replace('/', '-')}.{fmt}")
+
+
+_template = None  # Per worker process, the pitch background is only drawn once
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")  # Render without a display, never block on plt.show()
+
+
+def render_shotmap(player_name, compiled_data, competition_name, path):
+    """Renders one shotmap straight to file, runs inside a worker process"""
+    global _template
+    import matplotlib.pyplot as plt
+    import shotmap
+    from shotmap_template import ShotmapTemplate
+
+    start = time.perf_counter()
+    if path.endswith(".png"):  # Blitted onto the pre-rendered template
+        if _template is None:
+            _template = ShotmapTemplate()
+        _template.save(path, player_name, compiled_data, competition_name)
+    else:  # Vector formats are drawn in full
+        fig = shotmap.visualize_shotmap(player_name, compiled_data, competition_name, show=False)
+        fig.savefig(path, bbox_inches="tight")
+        plt.close(fig)
+    return time.perf_counter() - start
+
+
+def batch_shotmaps(jobs, output_dir, fmt="png", processes=None, max_workers=8):
+    """
+    Writes a shotmap file for every (player_name, competition_name) job and
+    returns a report with one dict per job (status "ok" or "failed")
+
+    Every match shotmap is downloaded once and shared by all players in it,
+    rendering runs headlessly in a pool of processes
+
+    Example Usage:
+    batch_shotmaps([("Mohamed Salah", "Premier League 24/25"),
+                    ("Cody Gakpo", "Premier League 24/25")], "shotmaps")
+    batch_shotmaps(team_jobs(44, "Premier League 24/25"), "liverpool", fmt="svg")
+    """
+    import season_dataset
+    import shotmap
+    import shot_store
+    import warehouse
+
+    os.makedirs(output_dir, exist_ok=True)
+    report = [{"player": player_name, "competition": competition_name, "status": "pending",
+               "path": None, "error": None, "seconds": 0.0}
+              for player_name, competition_name in jobs]
+
+    def fail(job, error):
+        job["status"] = "failed"
+        job["error"] = f"{type(error).__name__}: {error}"
+
+    # Resolve players and their matches, jobs that fail here drop out.
+    # Seasons still being played only page back to the watermark of the last run
+    watermarks = {}  # (player_id, competition_name) -> watermark saved once its matches are stored
+
+    def find_matches(job):
+        start = time.perf_counter()
+        try:
+            player_id = shotmap.get_player_id(job["player"])
+            job["match_ids"], watermark = season_dataset.season_matches(player_id, job["competition"])
+            if watermark is not None:
+                job["player_id"] = player_id
+                watermarks[player_id, job["competition"]] = watermark
+        except Exception as error:
+            fail(job, error)
+        job["seconds"] += time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(find_matches, report))
+    active = [job for job in report if job["status"] != "failed"]
+
+    # Download every match once, no matter how many players took part
+    competitions = {}
+    for job in active:
+        competitions.setdefault(job["competition"], []).extend(job["match_ids"])
+    for competition_name, match_ids in competitions.items():
+        try:
+            warehouse.ensure_matches(competition_name, match_ids, max_workers)
+        except shot_store.FetchError as error:  # Only jobs needing a failed match fail
+            for job in active:
+                failed = [match_id for match_id in job["match_ids"] if match_id in error.errors]
+                if job["competition"] == competition_name and failed:
+                    fail(job, shot_store.FetchError({match_id: error.errors[match_id] for match_id in failed}))
+        except Exception as error:  # Couldn't store anything, the whole competition fails
+            for job in active:
+                if job["competition"] == competition_name:
+                    fail(job, error)
+    for job in active:
+        if job["status"] == "failed":
+            job.pop("match_ids")
+        elif "player_id" in job:  # Its matches are stored, so the next run starts from here
+            season_dataset.save_watermark(job["player_id"], job["competition"],
+                                          watermarks[job["player_id"], job["competition"]])
+        job.pop("player_id", None)
+    active = [job for job in active if job["status"] != "failed"]
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as executor:
+        renders = {}
+        for job in active:
+            compiled_data = warehouse.season_shots(job["player"], job["competition"], job.pop("match_ids"))
+            if compiled_data.empty:
+                job["status"] = "failed"
+                job["error"] = "Player took no shots during this competition"
+                continue
+            job["path"] = output_path(output_dir, job["player"], job["competition"], fmt)
+            renders[executor.submit(render_shotmap, job["player"], compiled_data,
+                                    job["competition"], job["path"])] = job
+
+        for done, future in enumerate(as_completed(renders), 1):
+            job = renders[future]
+            try:
+                job["seconds"] += future.result()
+                job["status"] = "ok"
+            except Exception as error:
+                fail(job, error)
+            print(f"{done}/{len(renders)} done: {job['player']} ({job['competition']}) {job['status']}")
+
+    print_report(report)
+    return report
+
+
+def print_report(report):
+    """Prints how many shotmaps were made and why the others failed"""
+    failed = [job for job in report if job["status"] != "ok"]
+    print(f"Rendered {len(report) - len(failed)}/{len(report)} shotmaps")
+    for job in failed:
+        print(f"  FAILED {job['player']} ({job['competition']}): {job['error']}")
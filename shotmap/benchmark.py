@@ -0,0 +1,80 @@
+"""Benchmarks for the shotmap pipeline using synthetic shot data (no network needed)"""
+
+import io
+import time
+import matplotlib
+matplotlib.use("Agg")  # Headless, nothing pops up
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import shotmap
+
+
+def synthetic_shots(n, seed=0):
+    """Returns n random shots in the same schema as shotmap_compiler"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "shot_type": rng.choice(["goal", "save", "miss", "block", "post"], n),
+        "situation": rng.choice(["regular", "assisted", "corner", "fast-break", "penalty"], n),
+        "body_part": rng.choice(["right-foot", "left-foot", "head"], n),
+        "x": rng.uniform(1, 35, n),
+        "y": rng.uniform(15, 85, n),
+        "xg": rng.uniform(0.01, 0.8, n),
+    })
+
+
+def benchmark_render(sizes=(10, 100, 1000, 10000), repeats=3):
+    """Times building and rasterizing a shotmap figure as the number of shots grows"""
+    print(f"{'shots':>8} {'render (s)':>12}")
+    for n in sizes:
+        compiled_data = synthetic_shots(n)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fig = shotmap.visualize_shotmap("Benchmark Player", compiled_data, "Premier League 24/25", show=False)
+            fig.savefig(io.BytesIO(), format="png")  # Include rasterizing
+            plt.close(fig)
+            timings.append(time.perf_counter() - start)
+        print(f"{n:>8} {min(timings):>12.3f}")
+
+
+def benchmark_template(players=50, shots=100):
+    """Compares rendering many shotmap PNGs from scratch and from a pre-rendered template"""
+    from shotmap_template import ShotmapTemplate
+
+    datasets = [shotmap.compact_dtypes(synthetic_shots(shots, seed)) for seed in range(players)]
+
+    start = time.perf_counter()
+    for compiled_data in datasets:
+        fig = shotmap.visualize_shotmap("Benchmark Player", compiled_data, "Premier League 24/25", show=False)
+        fig.savefig(io.BytesIO(), format="png", bbox_inches="tight")
+        plt.close(fig)
+    scratch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    template = ShotmapTemplate()
+    for compiled_data in datasets:
+        template.save(io.BytesIO(), "Benchmark Player", compiled_data, "Premier League 24/25")
+    blitted = time.perf_counter() - start
+
+    print(f"{'players':>8} {'scratch (s)':>12} {'template (s)':>13} {'speedup':>8}")
+    print(f"{players:>8} {scratch:>12.2f} {blitted:>13.2f} {scratch / blitted:>7.1f}x")
+
+
+def benchmark_memory(sizes=(1000, 100000)):
+    """Compares memory of shot data in plain (object/float64) and compact dtypes"""
+    print(f"{'shots':>8} {'plain (KB)':>12} {'compact (KB)':>14} {'ratio':>7}")
+    for n in sizes:
+        plain = synthetic_shots(n).astype({"shot_type": object, "situation": object, "body_part": object})
+        plain.insert(0, "match_id", np.arange(n) // 20 + 12000000)
+        plain.insert(1, "player_id", np.arange(n) % 500 + 800000)
+        compact = shotmap.compact_dtypes(plain)
+        plain_kb = plain.memory_usage(deep=True).sum() / 1024
+        compact_kb = compact.memory_usage(deep=True).sum() / 1024
+        print(f"{n:>8} {plain_kb:>12.0f} {compact_kb:>14.0f} {plain_kb / compact_kb:>6.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark_render()
+    benchmark_template()
+    benchmark_memory()
@@ -0,0 +1,131 @@
+"""Reusable pool of headless Chrome browsers for the Selenium scrapers"""
+
+import atexit
+import threading
+from contextlib import contextmanager
+
+
+class BrowserPool:
+    """
+    Lends out headless Chrome drivers, starting them only when first needed
+
+    A driver is recycled (quit and replaced) after max_uses borrows,
+    or straight away if it crashed while borrowed
+
+    Example Usage:
+    with BrowserPool(size=2) as pool:
+        with pool.browser() as browser:
+            browser.get("https://www.sofascore.com")
+    """
+
+    def __init__(self, size=2, max_uses=50, headless=True):
+        self.size = size
+        self.max_uses = max_uses
+        self.headless = headless
+        self._idle = []  # Drivers ready to be borrowed
+        self._uses = {}  # Driver -> times borrowed
+        self._started = 0
+        self._closed = False
+        self._available = threading.Condition()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start_driver(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        # Configure for performance
+        options = Options()
+        if self.headless:
+            options.add_argument("--headless=new")
+        return webdriver.Chrome(options=options)
+
+    def acquire(self, timeout=None):
+        """Borrows a driver, waits for one to be returned if all are in use"""
+        with self._available:
+            ready = lambda: self._closed or self._idle or self._started < self.size
+            if not self._available.wait_for(ready, timeout):
+                raise TimeoutError("No browser became available")
+            if self._closed:
+                raise RuntimeError("Browser pool is closed")
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1  # Reserve the slot, start browser outside the lock
+
+        try:
+            driver = self._start_driver()
+        except Exception:
+            with self._available:
+                self._started -= 1
+                self._available.notify()
+            raise
+        with self._available:
+            self._uses[driver] = 0
+        return driver
+
+    def release(self, driver, broken=False):
+        """Returns a borrowed driver, quitting it if broken, worn out or the pool is closed"""
+        with self._available:
+            self._uses[driver] += 1
+            if not broken and not self._closed and self._uses[driver] < self.max_uses:
+                self._idle.append(driver)
+                self._available.notify()
+                return
+        self._discard(driver)
+
+    def _discard(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass  # Already dead
+        with self._available:
+            del self._uses[driver]
+            self._started -= 1
+            self._available.notify()
+
+    @staticmethod
+    def alive(driver):
+        """Returns whether a driver still responds"""
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @contextmanager
+    def browser(self, timeout=None):
+        """Borrows a driver for a with block, checks it survived any error inside"""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except BaseException:
+            self.release(driver, broken=not self.alive(driver))
+            raise
+        self.release(driver)
+
+    def close(self):
+        """Quits every idle driver, borrowed ones are quit when returned"""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()  # Waiting borrowers give up
+        for driver in idle:
+            self._discard(driver)
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def default_pool(size=2):
+    """Returns the process-wide pool shared by all scrapers, size only applies on first call"""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = BrowserPool(size=size)
+            atexit.register(_default_pool.close)
+    return _default_pool
@@ -0,0 +1,105 @@
+"""
+Command-line batch driver, renders every shotmap in a job manifest
+
+Example Usage:
+python cli.py jobs.json -o shotmaps
+python cli.py jobs.csv -o shotmaps --format svg --processes 4
+
+Manifests list one job per player, or a whole SofaScore team:
+jobs.json: [{"player": "Mohamed Salah", "competition": "Premier League 24/25"},
+            {"team": 44, "competition": "Premier League 24/25"}]
+jobs.csv:  player,competition
+           Mohamed Salah,Premier League 24/25
+
+Writes the figures and report.json (status, error and seconds per job) to
+the output directory, exits with 1 if any job failed
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+
+def read_manifest(path):
+    """Returns list of job dicts from a .json or .csv manifest"""
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.lower().endswith(".json"):
+            entries = json.load(file)
+        elif path.lower().endswith(".csv"):
+            entries = list(csv.DictReader(file))
+        else:
+            raise ValueError(f"Manifest must be .json or .csv: {path}")
+
+    if not isinstance(entries, list):
+        raise ValueError("Manifest must be a list of jobs")
+    for i, entry in enumerate(entries):
+        if not entry.get("competition") or not (entry.get("player") or entry.get("team")):
+            raise ValueError(f"Job {i + 1} needs a competition and a player or team: {entry}")
+        if not entry.get("player") and not str(entry["team"]).strip().isdigit():
+            raise ValueError(f"Job {i + 1} team must be a SofaScore team ID: {entry}")
+    return entries
+
+
+def manifest_jobs(entries):
+    """
+    Returns (player_name, competition_name) jobs, expanding team entries
+    into their squads, and a failed report row for every team that couldn't be
+    """
+    import batch
+    import shotmap
+
+    jobs = []
+    failed = []
+    for entry in entries:
+        if entry.get("player"):
+            jobs.append(shotmap.normalize_inputs(entry["player"], entry["competition"]))
+            continue
+        competition_name = shotmap.normalize_competition(entry["competition"])
+        try:
+            jobs.extend(batch.team_jobs(int(entry["team"]), competition_name))
+        except Exception as error:  # Squad lookup failed, the other jobs still run
+            failed.append({"player": f"team {entry['team']}", "competition": competition_name,
+                           "status": "failed", "path": None,
+                           "error": f"{type(error).__name__}: {error}", "seconds": 0.0})
+    return list(dict.fromkeys(jobs)), failed  # Same job twice is only rendered once
+
+
+def write_report(report, output_dir):
+    """Writes report.json to the output directory, returns its path"""
+    path = os.path.join(output_dir, "report.json")
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render shotmaps for every job in a manifest")
+    parser.add_argument("manifest", help=".json or .csv file of jobs")
+    parser.add_argument("-o", "--output-dir", default="shotmaps", help="where figures and report.json go")
+    parser.add_argument("--format", default="png", choices=["png", "svg", "pdf"], help="figure file format")
+    parser.add_argument("--processes", type=int, default=None, help="render processes (default: one per CPU)")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent lookups and downloads")
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use("Agg")  # Headless, nothing ever blocks on a window
+    import batch
+
+    try:
+        entries = read_manifest(args.manifest)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    jobs, failed = manifest_jobs(entries)
+    for job in failed:
+        print(f"  FAILED {job['player']} ({job['competition']}): {job['error']}")
+    report = failed + batch.batch_shotmaps(jobs, args.output_dir, fmt=args.format,
+                                           processes=args.processes, max_workers=args.workers)
+    print(f"Report written to {write_report(report, args.output_dir)}")
+    return 0 if all(job["status"] == "ok" for job in report) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
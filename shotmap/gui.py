@@ -1,32 +1,127 @@
 """Graphical user interface for visualizing shotmap data"""
 
 import tkinter as tk
-from tkinter import filedialog
+from tkinter import filedialog, messagebox, ttk
 import matplotlib.pyplot as plt
-import os
+import base64
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import shotmap
+from session_cache import SessionCache, DEFAULT_MAX_BYTES
 
-def main():
-    def window_season_shotmap():
-        """Opens new window displaying season shotmap"""
-        # Opens new window, when close root, will close this window too
-        visualization = tk.Toplevel() 
 
-        # Collect arguments from user entry
-        player_name = player_entry.get()
-        competition_name = competition_entry.get()
+class Cancelled(Exception):
+    """Raised inside a worker when its request has been cancelled"""
+
+
+def load_season_shotmap(player_name, competition_name, stage, cancelled):
+    """
+    Does the slow part of season_shotmap (player lookup and downloads),
+    runs in a worker thread so the window never freezes
+
+    Reports its current stage in stage["text"] and stops between stages
+    once the cancelled event is set
+    """
+    def enter(text):
+        if cancelled.is_set():
+            raise Cancelled
+        stage["text"] = text
+
+    player_name, competition_name = shotmap.normalize_inputs(player_name, competition_name)
+    enter(f"Finding {player_name}...")
+    player_id = shotmap.get_player_id(player_name)
+    enter(f"Downloading {competition_name} shots...")
+    compiled_data = shotmap.shotmap_compiler(player_id, player_name, competition_name)
+    enter("Rendering...")
+    return player_name, competition_name, compiled_data
 
-        # Save shotmap visualization as an image
-        fig = shotmap.season_shotmap(player_name, competition_name)
-        fig.savefig("season_shotmap_preview.png", bbox_inches="tight", dpi=75)
-        fig.savefig("season_shotmap_original.png", bbox_inches="tight")
-        shotmap_plot = tk.PhotoImage(file="season_shotmap_preview.png")
+
+def main(max_cache_bytes=DEFAULT_MAX_BYTES):
+    executor = ThreadPoolExecutor(max_workers=2)  # Further requests wait in the queue
+    pending = set()  # Cancel events of requests still loading
+    cache = SessionCache(max_cache_bytes)  # Recent shotmaps reopen instantly
+
+    def window_season_shotmap(player_name=None, competition_name=None, refresh=False):
+        """Opens loading window, then the season shotmap once its data is in"""
+        # Collect arguments from user entry
+        if player_name is None:
+            player_name = player_entry.get()
+            competition_name = competition_entry.get()
+
+        if refresh:
+            cache.invalidate(player_name, competition_name)
+        cached = cache.get(player_name, competition_name)
+        if cached is not None:
+            display_season_shotmap(*cache.key(player_name, competition_name), *cached)
+            return
+
+        # Loading window with progress bar, one per request
+        loading = tk.Toplevel()
+        loading.title("Football Hub")
+        loading.config(background="#0C0D0E")
+        loading.resizable(False, False)
+        status_label = tk.Label(loading, text=f"{player_name}: queued...", fg="white", bg="#0C0D0E")
+        status_label.pack(padx=10, pady=5)
+        progress = ttk.Progressbar(loading, mode="indeterminate", length=250)
+        progress.pack(padx=10)
+        progress.start(10)
+
+        stage = {"text": "Queued..."}  # Written by the worker, read here
+        cancelled = threading.Event()
+        pending.add(cancelled)
+        future = executor.submit(load_season_shotmap, player_name, competition_name, stage, cancelled)
+
+        def cancel():
+            cancelled.set()
+            future.cancel()  # Never starts if still queued
+            pending.discard(cancelled)
+            loading.destroy()
+
+        tk.Button(loading, text="Cancel", fg="black", bg="white", command=cancel).pack(pady=5)
+        loading.protocol("WM_DELETE_WINDOW", cancel)
+
+        # Check on the worker from the main thread, Tk isn't thread-safe
+        def poll():
+            if cancelled.is_set():
+                return
+            if not future.done():
+                status_label.config(text=f"{player_name}: {stage['text'].lower()}")
+                root.after(100, poll)
+                return
+
+            pending.discard(cancelled)
+            loading.destroy()
+            try:
+                result = future.result()
+            except Exception as e:
+                messagebox.showerror("Football Hub", f"Could not load shotmap for {player_name}:\n{e}")
+                return
+            cache.put(*result)
+            display_season_shotmap(*result)
+
+        root.after(100, poll)
+
+    def display_season_shotmap(player_name, competition_name, compiled_data, preview=None):
+        """Opens new window displaying season shotmap, renders on the main thread"""
+        # Opens new window, when close root, will close this window too
+        visualization = tk.Toplevel()
+        visualization.title(f"{player_name} - {competition_name}")
+
+        # Render preview into memory, nothing is written to disk
+        if preview is None:
+            fig = shotmap.visualize_shotmap(player_name, compiled_data, competition_name, show=False)
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format="png", bbox_inches="tight", dpi=75)
+            plt.close(fig)  # Free up memory
+            preview = buffer.getvalue()
+            cache.set_preview(player_name, competition_name, preview)
+        shotmap_plot = tk.PhotoImage(data=base64.b64encode(preview))
 
         # Display the shotmap in the new window
         shotmap_label = tk.Label(visualization, image=shotmap_plot)
         shotmap_label.image = shotmap_plot  # Prevents garbage collection
         shotmap_label.pack()
-        plt.close(fig)  # Free up memory
         visualization.resizable(False, False)  # Prevents resizing
 
         # Add menubar where you can save the visualization as a file to your computer
@@ -34,13 +129,25 @@ def main():
         visualization.config(menu=menubar)
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
-        file_menu.add_command(label="Save As", command=lambda: save_file())
+        file_menu.add_command(label="Save As",
+                              command=lambda: save_file(player_name, competition_name, compiled_data))
+
+        # Refresh drops the cached shotmap and downloads it again, picking up new matches
+        def refresh():
+            visualization.destroy()
+            window_season_shotmap(player_name, competition_name, refresh=True)
+
+        file_menu.add_command(label="Refresh", command=refresh)
 
-    def save_file():
-        import shutil
+    def save_file(player_name, competition_name, compiled_data):
+        """Renders the full resolution shotmap, only once a file has been chosen"""
         files = [("PNG files", "*.png")]
         file = filedialog.asksaveasfilename(filetypes=files, defaultextension=files[0][1])
-        shutil.copy("season_shotmap_original.png", file)
+        if not file:  # Dialog cancelled
+            return
+        fig = shotmap.visualize_shotmap(player_name, compiled_data, competition_name, show=False)
+        fig.savefig(file, bbox_inches="tight")
+        plt.close(fig)
 
 
     root = tk.Tk()  # Instantiates window
@@ -150,10 +257,11 @@ def main():
                     ).grid(row=3,column=0, columnspan=2, sticky="s")
 
 
-    # Delete image from directory when close root window
+    # Stop loading requests when close root window
     def close_window():
-        os.remove("season_shotmap_preview.png")
-        os.remove("season_shotmap_original.png")
+        for cancelled in pending:  # Workers stop at their next stage
+            cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", close_window)
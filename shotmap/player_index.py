@@ -0,0 +1,82 @@
+"""Persistent local index of known SofaScore player IDs"""
+
+import csv
+import os
+import sqlite3
+import unicodedata
+from contextlib import closing
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "player_ids.db")
+
+# Letters that do not decompose into a base letter + accent under NFKD
+SPECIAL_LETTERS = str.maketrans({"ø": "o", "æ": "ae", "œ": "oe", "ß": "ss", "ł": "l", "đ": "d", "ı": "i"})
+
+
+def normalize_name(player_name):
+    """Returns accent- and case-insensitive lookup key for a player name"""
+    name = unicodedata.normalize("NFKD", player_name.casefold())
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    name = name.translate(SPECIAL_LETTERS)
+    return " ".join(name.split())  # Collapse stray whitespace
+
+
+class PlayerIndex:
+    """
+    Maps normalized player names to SofaScore player IDs
+
+    Example Usage:
+    index = PlayerIndex()
+    index.add("Kylian Mbappé", "826643")
+    index.lookup("kylian mbappe")  # '826643'
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS players ("
+                "key TEXT PRIMARY KEY, name TEXT NOT NULL, player_id TEXT NOT NULL)"
+            )
+
+    def _connect(self):
+        # New connection per operation, so the index can be shared across threads
+        return sqlite3.connect(self.path)
+
+    def lookup(self, player_name):
+        """Returns stored player ID for given player, None if unknown"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT player_id FROM players WHERE key = ?", (normalize_name(player_name),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def add(self, player_name, player_id):
+        """Stores (or replaces) player ID for given player"""
+        self.add_many([(player_name, player_id)])
+
+    def add_many(self, players):
+        """Stores many (player_name, player_id) pairs in one transaction"""
+        rows = [(normalize_name(name), name, str(player_id)) for name, player_id in players]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO players VALUES (?, ?, ?)", rows)
+        return len(rows)
+
+    def all(self):
+        """Returns list of every stored (player_name, player_id) pair"""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT name, player_id FROM players ORDER BY key").fetchall()
+
+    def import_csv(self, file_path):
+        """Bulk imports a CSV file with 'name' and 'player_id' columns"""
+        with open(file_path, newline="", encoding="utf-8") as file:
+            players = [(row["name"], row["player_id"]) for row in csv.DictReader(file)]
+        return self.add_many(players)
+
+    def export_csv(self, file_path):
+        """Writes every stored player to a CSV file with 'name' and 'player_id' columns"""
+        players = self.all()
+        with open(file_path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["name", "player_id"])
+            writer.writerows(players)
+        return len(players)
@@ -0,0 +1,77 @@
+"""Resolve player names to SofaScore IDs through the JSON search API, no browser needed"""
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from player_index import normalize_name
+
+
+def search_players(query, session=None):
+    """Returns player entities SofaScore suggests for a query, in SofaScore's order"""
+    import sofascore
+
+    response = sofascore.get(f"/search/all?q={quote(query)}&page=0", session)
+    if response.status_code != 200:
+        if response.status_code != 404:  # 404 means nothing found
+            print(response.status_code)
+        return []
+    results = response.json().get("results", [])
+    return [result["entity"] for result in results if result.get("type") == "player"]
+
+
+def rank_candidates(player_name, candidates, team=None, position=None):
+    """
+    Returns candidates best match first
+
+    Exact (accent- and case-insensitive) name beats a partial one, then a
+    matching team, then a matching position ('G', 'D', 'M' or 'F'), and
+    SofaScore's own order settles the rest
+    """
+    key = normalize_name(player_name)
+
+    def rank(indexed):
+        order, candidate = indexed
+        names = {normalize_name(candidate.get(field) or "") for field in ("name", "shortName")}
+        team_name = normalize_name((candidate.get("team") or {}).get("name") or "")  # "team" can be null
+        return (
+            key not in names,
+            team is not None and normalize_name(team) not in team_name,
+            position is not None and candidate.get("position") != position.upper(),
+            order,
+        )
+
+    return [candidate for _, candidate in sorted(enumerate(candidates), key=rank)]
+
+
+def resolve_player_id(player_name, team=None, position=None, session=None):
+    """
+    Returns SofaScore player ID (string) for given player, None if no player found
+
+    Example Usage:
+    resolve_player_id("Mohamed Salah")  # '159665'
+    resolve_player_id("Danilo", team="Juventus", position="D")
+    """
+    candidates = rank_candidates(player_name, search_players(player_name, session), team, position)
+    return str(candidates[0]["id"]) if candidates else None
+
+
+def resolve_player_ids(player_names, max_workers=8, index=None):
+    """
+    Returns {player_name: player_id} for many names, None for names not found
+
+    Known players come straight from the player index, the rest are
+    searched concurrently and remembered
+    """
+    import player_index
+    import sofascore
+
+    index = index or player_index.PlayerIndex()
+    resolved = {name: index.lookup(name) for name in player_names}
+    unknown = [name for name, player_id in resolved.items() if player_id is None]
+
+    session = sofascore.get_session()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        found = dict(zip(unknown, executor.map(lambda name: resolve_player_id(name, session=session), unknown)))
+
+    index.add_many([(name, player_id) for name, player_id in found.items() if player_id is not None])
+    resolved.update(found)
+    return resolved
@@ -0,0 +1,96 @@
+"""Adaptive token-bucket rate limiting for outbound requests"""
+
+import threading
+import time
+
+
+def throttled(status_code):
+    """Returns whether a response means the server is pushing back"""
+    return status_code == 429 or status_code >= 500
+
+
+class RateLimiter:
+    """
+    Token bucket that slows down when the server pushes back (429/5xx)
+    and speeds back up while responses are healthy
+
+    The rate is halved on every throttled response and grows by `increase`
+    requests/second on every healthy one, between min_rate and max_rate
+
+    Example Usage:
+    limiter = RateLimiter(rate=5)
+    limiter.acquire()
+    response = session.get(url)
+    limiter.feedback(response.status_code)
+    """
+
+    def __init__(self, rate=5.0, burst=5, min_rate=0.1, max_rate=20.0, increase=0.1):
+        self.rate = rate  # Requests per second
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Blocks until a request may be sent"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def feedback(self, status_code):
+        """Adjusts the rate to how the server answered"""
+        with self._lock:
+            if throttled(status_code):
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._tokens = 0  # Pause before the next request
+            elif status_code < 400:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def call(self, func, *args, retry_on=(), attempts=5, **kwargs):
+        """
+        Calls func under the limiter for clients that raise instead of
+        returning status codes, retry_on exceptions count as throttling
+        """
+        for attempt in range(attempts):
+            self.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except retry_on:
+                self.feedback(429)
+                if attempt == attempts - 1:
+                    raise
+                continue
+            self.feedback(200)
+            return result
+
+
+# Starting points for each service, the limiters settle on the real limits
+DEFAULTS = {
+    "sofascore": {"rate": 10.0, "burst": 16, "max_rate": 50.0, "increase": 0.5},
+    "images": {"rate": 10.0, "burst": 10},
+    "gemini": {"rate": 0.25, "burst": 1, "max_rate": 2.0, "increase": 0.05},
+}
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter(service):
+    """Returns the process-wide limiter for a service ('sofascore', 'images', 'gemini')"""
+    with _limiters_lock:
+        if service not in _limiters:
+            _limiters[service] = RateLimiter(**DEFAULTS.get(service, {}))
+    return _limiters[service]
@@ -0,0 +1,133 @@
+"""Size-bounded on-disk cache of SofaScore API responses"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "response_cache.db")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+IMMUTABLE = math.inf  # TTL for content that never changes (e.g. finished match shotmaps)
+
+
+class CacheEntry:
+    """Cached response body plus what is needed to revalidate it"""
+
+    def __init__(self, body, etag, last_modified, expires_at):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at  # None = never expires
+
+    @property
+    def fresh(self):
+        return self.expires_at is None or self.expires_at > time.time()
+
+    def revalidation_headers(self):
+        """Returns conditional request headers, empty if server gave no validators"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Response bodies keyed by URL, evicted least recently used once the
+    cache grows past max_bytes
+
+    Example Usage:
+    cache = ResponseCache()
+    cache.put(url, body, ttl=600)
+    cache.get(url).body
+    cache.stats()  # {'hits': 1, 'misses': 0, 'revalidated': 0, ...}
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # Lets threads read while one writes
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, last_modified TEXT, "
+                "expires_at REAL, last_access REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, url):
+        """Returns CacheEntry for url (fresh or stale), None if never cached"""
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+
+        entry = CacheEntry(*row)
+        self._count("hits" if entry.fresh else "misses")
+        return entry
+
+    def put(self, url, body, ttl, etag=None, last_modified=None):
+        """Stores body for url, ttl in seconds (IMMUTABLE = never expires)"""
+        expires_at = None if ttl == IMMUTABLE else time.time() + ttl
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, expires_at, time.time(), len(body)),
+            )
+        self.evict()
+
+    def refresh(self, url, ttl):
+        """Extends a stale entry after the server confirmed it is unchanged (304)"""
+        expires_at = None if ttl == IMMUTABLE else time.time() + ttl
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE responses SET expires_at = ?, last_access = ? WHERE url = ?",
+                (expires_at, time.time(), url),
+            )
+        self._count("revalidated")
+
+    def evict(self):
+        """Drops least recently used entries until the cache fits in max_bytes"""
+        with closing(self._connect()) as conn, conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+
+            evicted = 0
+            rows = conn.execute("SELECT url, size FROM responses ORDER BY last_access").fetchall()
+            for url, size in rows:
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                total -= size
+                evicted += 1
+        return evicted
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self):
+        """Returns hit/miss counters for this process plus current cache size"""
+        with closing(self._connect()) as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "revalidated": self.revalidated,
+                "entries": entries, "bytes": size}
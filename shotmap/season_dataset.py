@@ -0,0 +1,145 @@
+"""Per-(player, competition) season watermarks so shot data refreshes incrementally"""
+
+import json
+import os
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datasets")
+PENDING_STATUSES = ("notstarted", "inprogress")  # Anything else (finished, postponed, canceled) is settled
+
+
+def watermark_path(player_id, competition_name, data_dir=DEFAULT_DIR):
+    """Returns watermark json path for a player's competition season"""
+    return os.path.join(data_dir, f"{player_id} - {competition_name.replace('/', '-')}.json")
+
+
+def load_watermark(player_id, competition_name, data_dir=DEFAULT_DIR):
+    """Returns saved watermark of a season, None if never compiled"""
+    path = watermark_path(player_id, competition_name, data_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_watermark(player_id, competition_name, watermark, data_dir=DEFAULT_DIR):
+    """Saves watermark, only once the season's shots are in the warehouse so a crash never skips matches"""
+    os.makedirs(data_dir, exist_ok=True)
+    with open(watermark_path(player_id, competition_name, data_dir), "w") as file:
+        json.dump(watermark, file)
+
+
+def new_events(player_id, watermark, max_pages=50):
+    """
+    Returns events newer than the watermark, newest pages first
+
+    Stops at the first page that reaches back to the watermark,
+    usually that is page 0
+    """
+    import sofascore
+
+    events = []
+    for pg_num in range(max_pages):
+        response = sofascore.get(f"/player/{player_id}/events/last/{pg_num}", ttl=sofascore.EVENTS_TTL)
+        if response.status_code == 404:  # No more pages
+            break
+        response.raise_for_status()  # Missing a page would let the watermark skip its matches
+
+        data = response.json()
+        matches = data.get("events", [])
+        events.extend(match for match in matches if match["startTimestamp"] >= watermark["last_timestamp"])
+        if any(match["startTimestamp"] < watermark["last_timestamp"] for match in matches):
+            break
+        if not data.get("hasNextPage", True):
+            break
+    return events
+
+
+def advance_watermark(watermark, events, match_ids):
+    """
+    Returns watermark moved up to the newest settled event
+
+    Never moves past an event not started or still in progress, so it is
+    picked up once it has finished. Postponed and canceled events don't
+    hold it back
+    """
+    pending = min((event["startTimestamp"] for event in events
+                   if event.get("status", {}).get("type") in PENDING_STATUSES), default=float("inf"))
+    settled = [event for event in events if event["startTimestamp"] < pending]
+    if settled:
+        newest = max(settled, key=lambda event: event["startTimestamp"])
+        watermark = {"last_event_id": newest["id"], "last_timestamp": newest["startTimestamp"]}
+    return {**watermark, "match_ids": match_ids}
+
+
+def next_watermark(player_id, competition_name, data_dir=DEFAULT_DIR):
+    """
+    Returns the season's watermark moved past matches finished since it was
+    saved, with every match ID so far. Not saved, call save_watermark once
+    those matches are in the warehouse
+
+    The first call lists the whole season, later calls read the newest
+    event pages back to the saved watermark (one or two requests midweek)
+    """
+    import shotmap
+
+    watermark = load_watermark(player_id, competition_name, data_dir)
+    if watermark is None:
+        match_ids = shotmap.season_match_ids(player_id, competition_name)
+        # Start watermark at the newest event page, already cached by season_match_ids
+        events = new_events(player_id, {"last_timestamp": shotmap.season_start(competition_name)}, max_pages=1)
+        watermark = advance_watermark({"last_event_id": None, "last_timestamp": 0}, events, match_ids)
+    else:
+        events = new_events(player_id, watermark)
+        known = set(watermark["match_ids"])
+        new_match_ids = [
+            event["id"] for event in sorted(events, key=lambda event: event["startTimestamp"])
+            if event["season"]["name"] == competition_name
+            and event.get("status", {}).get("type") == "finished"
+            and event["id"] not in known
+        ]
+        watermark = advance_watermark(watermark, events, watermark["match_ids"] + new_match_ids)
+    return watermark
+
+
+def season_matches(player_id, competition_name, data_dir=DEFAULT_DIR):
+    """
+    Returns (match IDs, watermark) of a player's competition season
+
+    A season still being played is read incrementally through its watermark,
+    which the caller saves once the matches are in the warehouse. A finished
+    season's match list is cached for good by season_match_ids, its
+    watermark is None
+
+    Example Usage:
+    match_ids, watermark = season_matches(159665, "Premier League 25/26")
+    warehouse.ensure_matches("Premier League 25/26", match_ids)
+    if watermark is not None:
+        save_watermark(159665, "Premier League 25/26", watermark)
+    """
+    import time
+    import shotmap
+
+    if time.time() > shotmap.season_end(competition_name):
+        return shotmap.season_match_ids(player_id, competition_name), None
+    watermark = next_watermark(player_id, competition_name, data_dir)
+    return watermark["match_ids"], watermark
+
+
+def refresh_season(player_id, player_name, competition_name, data_dir=DEFAULT_DIR):
+    """
+    Returns a player's compiled shot data for a competition, only downloading
+    matches finished since the last refresh
+
+    Example Usage:
+    compiled_data = refresh_season(159665, "Mohamed Salah", "Premier League 24/25")
+    """
+    import warehouse
+
+    watermark = next_watermark(player_id, competition_name, data_dir)
+    # Only matches missing from the warehouse are downloaded
+    warehouse.ensure_matches(competition_name, watermark["match_ids"])
+    save_watermark(player_id, competition_name, watermark, data_dir)
+
+    compiled_data = warehouse.season_shots(player_name, competition_name, watermark["match_ids"])
+    assert not compiled_data.empty, "Player took no shots during this competition"
+    return compiled_data
@@ -0,0 +1,80 @@
+"""In-process cache of compiled shot data and rendered previews for the GUI"""
+
+import threading
+from collections import OrderedDict
+from shotmap import normalize_inputs
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+
+
+class SessionCache:
+    """
+    Compiled shot data (and its preview PNG) keyed by normalized player and
+    competition, evicted least recently used once past max_bytes
+
+    Example Usage:
+    cache = SessionCache()
+    cache.put("mohamed salah", "premier league 24/25", compiled_data)
+    cache.get("Mohamed Salah", "Premier League 24/25")  # Same entry
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()  # key -> {"compiled_data", "preview", "size"}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(player_name, competition_name):
+        return normalize_inputs(player_name, competition_name)
+
+    @staticmethod
+    def _size(entry):
+        size = int(entry["compiled_data"].memory_usage(deep=True).sum())
+        if entry["preview"] is not None:
+            size += len(entry["preview"])
+        return size
+
+    def get(self, player_name, competition_name):
+        """Returns (compiled_data, preview) marking it recently used, None if not cached"""
+        key = self.key(player_name, competition_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry["compiled_data"], entry["preview"]
+
+    def put(self, player_name, competition_name, compiled_data, preview=None):
+        """Stores compiled data, and preview PNG bytes if rendered, replacing any older entry"""
+        key = self.key(player_name, competition_name)
+        entry = {"compiled_data": compiled_data, "preview": preview}
+        entry["size"] = self._size(entry)
+        with self._lock:
+            self._discard(key)
+            if entry["size"] > self.max_bytes:  # Would evict everything, not worth keeping
+                return
+            self._entries[key] = entry
+            self.size += entry["size"]
+            while self.size > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def set_preview(self, player_name, competition_name, preview):
+        """Adds the rendered preview to a cached entry"""
+        cached = self.get(player_name, competition_name)
+        if cached is not None:
+            self.put(player_name, competition_name, cached[0], preview)
+
+    def invalidate(self, player_name, competition_name):
+        with self._lock:
+            self._discard(self.key(player_name, competition_name))
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry["size"]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
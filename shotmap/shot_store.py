@@ -0,0 +1,125 @@
+"""Match-level store of every shot in every fetched match"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from shotmap import SHOT_COLUMNS, compact_dtypes
+
+STORE_COLUMNS = ["match_id", "player_id", "player_name", "is_home"] + SHOT_COLUMNS
+
+
+class FetchError(Exception):
+    """Some matches couldn't be downloaded, errors = {match_id: exception}"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        failed = ", ".join(f"{match_id} ({type(error).__name__}: {error})" for match_id, error in errors.items())
+        super().__init__(f"{len(errors)} matches failed: {failed}")
+
+
+def normalize_shots(match_id, shotmap):
+    """
+    Turns a raw match shotmap into per-column lists covering both teams,
+    fields missing from a shot are stored as None
+    """
+    columns = {column: [] for column in STORE_COLUMNS}
+    for shot in shotmap:
+        player = shot.get("player") or {}
+        coordinates = shot.get("playerCoordinates") or {}
+        columns["match_id"].append(match_id)
+        columns["player_id"].append(player.get("id"))
+        columns["player_name"].append(player.get("name"))
+        columns["is_home"].append(shot.get("isHome"))
+        columns["shot_type"].append(shot.get("shotType"))
+        columns["situation"].append(shot.get("situation"))
+        columns["body_part"].append(shot.get("bodyPart"))
+        columns["x"].append(coordinates.get("x"))
+        columns["y"].append(coordinates.get("y"))
+        columns["xg"].append(shot.get("xg"))
+        # columns["xgot"].append(shot.get("xgot"))
+    return columns
+
+
+class ShotStore:
+    """
+    Downloads each match shotmap once and answers per-player queries from it
+
+    Example Usage:
+    store = ShotStore()
+    store.fetch(match_ids)  # One request per match, however many players
+    salah = store.player_shots("Mohamed Salah", match_ids)
+    gakpo = store.player_shots("Cody Gakpo", match_ids)  # No new requests
+    """
+
+    def __init__(self):
+        self._matches = {}  # match_id -> per-column lists from normalize_shots
+        self._lock = threading.Lock()
+
+    def __contains__(self, match_id):
+        return match_id in self._matches
+
+    def fetch(self, match_ids, max_workers=8):
+        """
+        Downloads every match not already in the store, concurrently. Failed
+        downloads are not stored, once the rest are in a FetchError names them
+        """
+        import shotmap
+        import sofascore
+
+        with self._lock:
+            missing = [match_id for match_id in dict.fromkeys(match_ids) if match_id not in self._matches]
+        if not missing:
+            return 0
+
+        session = sofascore.get_session()
+        errors = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(shotmap.get_match_shotmap, match_id, session) for match_id in missing]
+            for match_id, future in zip(missing, futures):
+                try:
+                    columns = normalize_shots(match_id, future.result())
+                except Exception as error:
+                    errors[match_id] = error
+                    continue
+                with self._lock:
+                    self._matches[match_id] = columns
+        if errors:
+            raise FetchError(errors)
+        return len(missing)
+
+    def match_shots(self, match_id):
+        """Returns DataFrame of every shot in a match, both teams, with the raw values (as stored)"""
+        import pandas as pd
+
+        self.fetch([match_id])
+        return pd.DataFrame(self._matches[match_id])
+
+    def player_shots(self, player_name, match_ids, max_workers=8):
+        """Returns DataFrame (SHOT_COLUMNS) of a player's shots over the given matches, in match order"""
+        import pandas as pd
+
+        self.fetch(match_ids, max_workers)
+        columns = {column: [] for column in SHOT_COLUMNS}
+        for match_id in match_ids:
+            match = self._matches[match_id]
+            for i, name in enumerate(match["player_name"]):
+                if name == player_name:
+                    for column in SHOT_COLUMNS:
+                        columns[column].append(match[column][i])
+        return compact_dtypes(pd.DataFrame(columns))
+
+    def clear(self):
+        with self._lock:
+            self._matches.clear()
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def default_store():
+    """Returns the process-wide store shared by shotmap and batch functions"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ShotStore()
+    return _default_store
@@ -34,8 +34,21 @@ def season_shotmap(player_name, competition_name):
     Only works for 22/23, 23/24, 24/25 seasons due to xG data collection
     MLS only works for 2024, 2025
     """
-    # Handle inputs
-    player_name = player_name.strip().title()
+    player_name, competition_name = normalize_inputs(player_name, competition_name)
+
+    # Generate shotmap
+    player_id = get_player_id(player_name)
+    compiled_data = shotmap_compiler(player_id, player_name, competition_name)
+    return visualize_shotmap(player_name, compiled_data, competition_name)
+
+
+def normalize_inputs(player_name, competition_name):
+    """Returns player and competition names cleaned up the way SofaScore writes them"""
+    return player_name.strip().title(), normalize_competition(competition_name)
+
+
+def normalize_competition(competition_name):
+    """Returns competition name cleaned up the way SofaScore writes it"""
     competition_name = competition_name.strip().title()
     if "Uefa" in competition_name:
         competition_name = competition_name.replace("Uefa", "UEFA")
@@ -45,181 +58,295 @@ def season_shotmap(player_name, competition_name):
         competition_name = competition_name.replace("Laliga", "LaLiga")
     if "Mls" in competition_name:
         competition_name = competition_name.replace("Mls", "MLS")
+    return competition_name
 
-    # Generate shotmap
-    player_id = get_player_id(player_name)
-    compiled_data = shotmap_compiler(player_id, player_name, competition_name)
-    return visualize_shotmap(player_name, compiled_data, competition_name)
+
+def compare_shotmaps(player_names, competition_name, show=True, max_workers=8):
+    """
+    Returns one figure comparing the shotmaps of two to four players in a given season
+
+    Players and their matches are looked up concurrently, and matches the
+    players share are only downloaded once
+
+    Example Usage:
+    compare_shotmaps(['Erling Haaland', 'Alexander Isak', 'Ollie Watkins'], 'Premier League 24/25')
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import season_dataset
+    import warehouse
+
+    if not 2 <= len(player_names) <= 4:
+        raise ValueError(f"Compare two to four players, got {len(player_names)}")
+    names = [player_name.strip().title() for player_name in player_names]
+    competition_name = normalize_competition(competition_name)
+
+    def player_matches(player_name):
+        player_id = get_player_id(player_name)
+        return player_id, *season_dataset.season_matches(player_id, competition_name)
+
+    with ThreadPoolExecutor(max_workers=len(names)) as executor:
+        seasons = list(executor.map(player_matches, names))
+    match_lists = [match_ids for _, match_ids, _ in seasons]
+
+    # One download per match, no matter how many of the players were in it
+    warehouse.ensure_matches(competition_name, [match_id for match_ids in match_lists for match_id in match_ids], max_workers)
+    for player_id, _, watermark in seasons:
+        if watermark is not None:
+            season_dataset.save_watermark(player_id, competition_name, watermark)
+    player_data = {}
+    for player_name, match_ids in zip(names, match_lists):
+        player_data[player_name] = warehouse.season_shots(player_name, competition_name, match_ids)
+        assert not player_data[player_name].empty, f"{player_name} took no shots during this competition"
+
+    return visualize_comparison(player_data, competition_name, show)
 
 
-def get_player_id(player_name):
-    """Returns SofaScore player ID for given player"""
-    from selenium import webdriver
+def get_player_id(player_name, index=None):
+    """
+    Returns SofaScore player ID for given player
+
+    Checks the local player index first, then SofaScore's JSON search,
+    and only searches with a browser if neither knows the player.
+    Whatever is found is remembered in the index
+    """
+    import player_index
+    import player_search
+
+    index = index or player_index.PlayerIndex()
+    player_id = index.lookup(player_name)
+    if player_id is not None:
+        return player_id
+
+    player_id = player_search.resolve_player_id(player_name)
+    if player_id is not None:
+        index.add(player_name, player_id)
+        return player_id
+
+    # Fall back to typing into the website's search box
     from selenium.webdriver.common.by import By
     from selenium.webdriver.common.keys import Keys
     from selenium.webdriver.support.wait import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.chrome.options import Options
-    import time
+    import browser_pool
     import re
 
-    # Configure for performance
-    options = Options()
-    options.add_argument("--headless=new")
+    # Search SofaScore for player url in a borrowed browser
+    with browser_pool.default_pool().browser() as browser:
+        browser.get("https://www.sofascore.com")
 
-    # Search SofaScore for player url
-    browser = webdriver.Chrome(options=options)
-    browser.get("https://www.sofascore.com")
+        # Wait for search input to load
+        search_player = WebDriverWait(browser, 10).until(
+            EC.presence_of_element_located((By.ID, "search-input"))
+        )
 
-    # Wait for search input to load
-    search_player = WebDriverWait(browser, 10).until(
-        EC.presence_of_element_located((By.ID, "search-input"))
-    )
+        # Query player name, wait for options to load, then select first option
+        player_links = (By.CSS_SELECTOR, "a[href*='/player/']")
+        links_before = len(browser.find_elements(*player_links))
+        search_player.send_keys(player_name)
+        WebDriverWait(browser, 10).until(
+            lambda browser: len(browser.find_elements(*player_links)) > links_before
+        )
+        search_player.send_keys(Keys.ARROW_DOWN, Keys.ENTER)
 
-    # Query player name, wait for options to load, then select first option
-    search_player.send_keys(player_name)
-    time.sleep(1.5)
-    search_player.send_keys(Keys.ARROW_DOWN, Keys.ENTER)
-
-    # When player url loads, grab the url and close browser
-    WebDriverWait(browser, 10).until(EC.url_contains("player"))
-    url = browser.current_url
-    browser.quit()
+        # When player url loads, grab the url and hand browser back
+        WebDriverWait(browser, 10).until(EC.url_contains("player"))
+        url = browser.current_url
 
     # Take player ID from end of url
-    player_id = re.findall(r"-\w+/(.*)", url)
-    return player_id[0]
+    player_id = re.findall(r"-\w+/(.*)", url)[0]
+    index.add(player_name, player_id)
+    return player_id
 
 
-def season_match_ids(player_id, competition_name):
-    """Returns SofaScore match IDs in chosen competition for chosen player"""
-    import requests
-    import codes
-    
-    match_ids = []
+def season_start(competition_name):
+    """
+    Returns earliest possible kickoff (unix timestamp) for a competition season
 
-    # Check to see how many pages you will need to loop through
-    if competition_name.split(" ")[-1] == "24/25":
-        n = 2
-    elif competition_name.split(" ")[-1] == "23/24":
-        n = 6
+    'Premier League 24/25' -> 1 Jan 2024, 'MLS 2024' -> 1 Jan 2024
+    """
+    from datetime import datetime, timezone
+
+    season = competition_name.split(" ")[-1]
+    if "/" in season:
+        start_year = 2000 + int(season.split("/")[0])
     else:
-        n = 10
-    
-    for i in range(n):  # Loops through page numbers for more complete season data
-        pg_num = i
-        url = f"https://www.sofascore.com/api/v1/player/{player_id}/events/last/{pg_num}"
-        response = requests.get(url, headers=codes.headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            matches = data.get("events", [])
-            
-            for match in matches:
-                match_filter = match.get("season")
-                if match_filter["name"] == competition_name:
-                    match_id = match.get("id")
-                    match_ids.append(match_id)
-        else:
-            print(response.status_code)
+        start_year = int(season)
+    return datetime(start_year, 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+def season_end(competition_name):
+    """
+    Returns time (unix timestamp) after which a competition season is over
+
+    'Premier League 24/25' -> 1 Jul 2025, 'MLS 2024' -> 1 Jan 2025
+    """
+    from datetime import datetime, timezone
+
+    season = competition_name.split(" ")[-1]
+    if "/" in season:
+        end = datetime(2000 + int(season.split("/")[1]), 7, 1, tzinfo=timezone.utc)
+    else:
+        end = datetime(int(season) + 1, 1, 1, tzinfo=timezone.utc)
+    return end.timestamp()
+
 
+def season_match_ids(player_id, competition_name, batch_size=4, max_pages=50):
+    """
+    Returns SofaScore match IDs of finished matches in chosen competition for chosen player
+
+    Event pages (newest first) are fetched batch_size at a time, and paging
+    stops at the first page where every event predates the season.
+    Once a season is over its match list is cached for good
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import json
+    import time
+    import sofascore
+    from response_cache import IMMUTABLE
+
+    # A finished season's match list never changes, so skip the event pages entirely
+    cache = sofascore.get_cache()
+    season_key = f"{sofascore.API_URL}/player/{player_id}/season-matches/{competition_name}"
+    season_over = time.time() > season_end(competition_name)
+    if season_over:
+        entry = cache.get(season_key)
+        if entry is not None:
+            return json.loads(entry.body)
+    
+    match_ids = []
+    cutoff = season_start(competition_name)
+    session = sofascore.get_session()
+
+    def get_page(pg_num):
+        return sofascore.get(f"/player/{player_id}/events/last/{pg_num}", session, ttl=sofascore.EVENTS_TTL)
+
+    done = False
+    with ThreadPoolExecutor(max_workers=batch_size) as executor:
+        for first_page in range(0, max_pages, batch_size):
+            pages = range(first_page, min(first_page + batch_size, max_pages))
+            for response in executor.map(get_page, pages):
+                if response.status_code == 404:  # No more pages
+                    done = True
+                    break
+                response.raise_for_status()  # Still failing after retries, never return a partial list
+
+                data = response.json()
+                matches = data.get("events", [])
+                for match in matches:
+                    match_filter = match.get("season")
+                    finished = match.get("status", {}).get("type") == "finished"
+                    if match_filter["name"] == competition_name and finished:
+                        match_id = match.get("id")
+                        match_ids.append(match_id)
+
+                # Pages go back in time, so once a whole page is too old we're done
+                if all(match["startTimestamp"] < cutoff for match in matches):
+                    done = True
+                    break
+                if not data.get("hasNextPage", True):
+                    done = True
+                    break
+            if done:
+                break
+
+    if season_over:
+        cache.put(season_key, json.dumps(match_ids).encode(), IMMUTABLE)
     return match_ids
 
 
-def get_shots(match_id, player_name):
-    """Returns list of shots in a given game taken by a given player"""
-    import requests
-    import codes
+SHOT_COLUMNS = ["shot_type", "situation", "body_part", "x", "y", "xg"]
+
+# Every value SofaScore uses for the low-cardinality shot fields, plus OTHER for anything else
+# Values SofaScore adds later become OTHER in memory, the warehouse keeps the raw strings
+OTHER = "other"
+SHOT_TYPES = ["goal", "save", "miss", "block", "post", OTHER]
+SITUATIONS = ["regular", "assisted", "fast-break", "corner", "set-piece", "free-kick", "throw-in-set-piece",
+              "penalty", OTHER]
+BODY_PARTS = ["right-foot", "left-foot", "head", OTHER]
+
+
+def shot_dtypes():
+    """Returns fixed compact dtype of every shot column"""
     import pandas as pd
+
+    return {
+        "match_id": "int32",
+        "player_id": "Int32",  # Nullable, a few shots come without a player
+        "shot_type": pd.CategoricalDtype(SHOT_TYPES),
+        "situation": pd.CategoricalDtype(SITUATIONS),
+        "body_part": pd.CategoricalDtype(BODY_PARTS),
+        "x": "float32",
+        "y": "float32",
+        "xg": "float64",  # Kept exact so the xG totals on the plot don't change
+    }
+
+
+def compact_dtypes(data):
+    """
+    Returns shot data converted to the fixed compact schema (only columns
+    present), values outside a category's vocabulary become OTHER instead of NaN
+    """
+    dtypes = {column: dtype for column, dtype in shot_dtypes().items() if column in data.columns}
+    data = data.copy()
+    for column, dtype in dtypes.items():
+        if hasattr(dtype, "categories"):
+            values = data[column].astype(object)
+            data[column] = values.where(values.isin(dtype.categories) | values.isna(), OTHER)
+    return data.astype(dtypes)
+
+
+def get_match_shotmap(match_id, session=None):
+    """Returns raw list of every shot taken in a given game, raises if the request failed"""
+    import sofascore
     
-    url = f"https://www.sofascore.com/api/v1/event/{match_id}/shotmap"
-    response = requests.get(url, headers=codes.headers)
+    # Only finished matches get here (see season_match_ids), their shotmaps never change
+    response = sofascore.get(f"/event/{match_id}/shotmap", session, ttl=sofascore.IMMUTABLE)
     
-    if response.status_code == 200:
-        shots = pd.DataFrame(response.json())["shotmap"]
-        data = pd.DataFrame()
-        for shot in shots:
-            if shot["player"]["name"] == f"{player_name}":
-                x, y, _ = shot["playerCoordinates"].values()
-
-                columns = {"shot_type": shot["shotType"],
-                           "situation": shot["situation"],
-                           "body_part": shot["bodyPart"],
-                           "x": x,
-                           "y": y,
-                           "xg": shot["xg"],
-                           # "xgot": shot["xgot"]
-                          }
-                
-                if data.empty:
-                    data = pd.DataFrame([columns])
-                else:
-                    new_data = pd.DataFrame([columns])
-                    data = pd.concat([data, new_data]).reset_index(drop=True)
-        return data
-    else:
-        print(response.code)
+    if response.status_code == 404:  # Match has no shotmap
+        return []
+    response.raise_for_status()  # Anything else is a failed download, not an empty match
+    return response.json()["shotmap"]
 
 
-def shotmap_compiler(player_id, player_name, competition_name):
-    """Returns compiled shot data from entire season for a given player"""
-    import pandas as pd
+def get_shots(match_id, player_name):
+    """Returns list of shots in a given game taken by a given player"""
+    import shot_store
+
+    return shot_store.default_store().player_shots(player_name, [match_id])
+
+
+def shotmap_compiler(player_id, player_name, competition_name, max_workers=8):
+    """
+    Returns compiled shot data from entire season for a given player
+
+    Matches missing from the shot warehouse are fetched concurrently
+    (max_workers at a time) and stored for good, then the player's shots
+    are read straight from the warehouse. A season still being played only
+    looks for matches finished since the last run
+    """
+    import season_dataset
+    import warehouse
     
-    compiled_data = pd.DataFrame()
-    shot_list = season_match_ids(player_id, competition_name)
-    for shot in shot_list:
-        match_data = get_shots(shot, player_name)
-        if compiled_data.empty:
-            compiled_data = match_data
-        else:
-            compiled_data = pd.concat([compiled_data, match_data]).reset_index(drop=True)
+    shot_list, watermark = season_dataset.season_matches(player_id, competition_name)
+    warehouse.ensure_matches(competition_name, shot_list, max_workers)
+    if watermark is not None:
+        season_dataset.save_watermark(player_id, competition_name, watermark)
+    compiled_data = warehouse.season_shots(player_name, competition_name, shot_list)
             
     assert not compiled_data.empty, "Player took no shots during this competition"
     
     return compiled_data
 
 
-def visualize_shotmap(player_name, compiled_data, competition_name):
-    """Generates shotmap visualization of given player using user shotmap data"""
-    import pandas as pd
-    import matplotlib.pyplot as plt
-    from mplsoccer import VerticalPitch
-    import sys
-    
-    background_color = "#0C0D0E"  # Hides plotlines
+BACKGROUND_COLOR = "#0C0D0E"  # Hides plotlines
 
-    # Set up figure
-    fig = plt.figure(figsize=(8, 12))
-    fig.patch.set_facecolor(background_color)
 
-    # First part of visualization, title & legend
-    ax1 = fig.add_axes([0, 0.7, 1, 0.2])
-    ax1.set_facecolor(background_color)
-    ax1.set_xlim(0, 1)
-    ax1.set_ylim(0, 1)
-
-    # Heading, includes name of player that was inputted 
-    ax1.text(
-        x=0.5,
-        y=0.85,
-        s=player_name,
-        fontsize=20,
-        fontweight="bold",
-        color="white",
-        ha="center"  # Horizontal alignment
-    )
-    ax1.text(
-        x=0.5,
-        y=0.75,
-        s=f"All non-penalty shots in the {competition_name}",
-        fontsize=14,
-        fontweight="bold",
-        color="white",
-        ha="center"
-    )
+def draw_legend(ax):
+    """Draws chance quality and goal legends onto the header axes"""
+    background_color = BACKGROUND_COLOR
 
     # Chance quality
-    ax1.text(
+    ax.text(
         x=0.23,
         y=0.5,
         s="Low quality chance",
@@ -230,52 +357,17 @@ def visualize_shotmap(player_name, compiled_data, competition_name):
     )
 
     # Chance legend, plots rise in size to represent higher xG
-    ax1.scatter(
-        x=0.37,
-        y=0.52,
-        s=100,
-        color=background_color,
-        edgecolor="white",
-        linewidth=0.8
-    )
-    
-    ax1.scatter(
-        x=0.42,
-        y=0.52,
-        s=200,
-        color=background_color,
-        edgecolor="white",
-        linewidth=0.8
-    )
+    for x, size in [(0.37, 100), (0.42, 200), (0.48, 300), (0.54, 400), (0.6, 500)]:
+        ax.scatter(
+            x=x,
+            y=0.52,
+            s=size,
+            color=background_color,
+            edgecolor="white",
+            linewidth=0.8
+        )
     
-    ax1.scatter(
-        x=0.48,
-        y=0.52,
-        s=300,
-        color=background_color,
-        edgecolor="white",
-        linewidth=0.8
-    )
-    
-    ax1.scatter(
-        x=0.54,
-        y=0.52,
-        s=400,
-        color=background_color,
-        edgecolor="white",
-        linewidth=0.8
-    )
-    
-    ax1.scatter(
-        x=0.6,
-        y=0.52,
-        s=500,
-        color=background_color,
-        edgecolor="white",
-        linewidth=0.8
-    )
-    
-    ax1.text(
+    ax.text(
         x=0.76,
         y=0.5,
         s="High quality chance",
@@ -286,7 +378,7 @@ def visualize_shotmap(player_name, compiled_data, competition_name):
     )
 
     # Goal legend, first text & plot represent goal, second represent no goal
-    ax1.text(
+    ax.text(
         x=0.44,
         y=0.27,
         s="Goal",
@@ -295,7 +387,7 @@ def visualize_shotmap(player_name, compiled_data, competition_name):
         color="white",
         ha="right"
     )
-    ax1.scatter(
+    ax.scatter(
         x=0.47,
         y=0.29,
         s=150,
@@ -305,7 +397,7 @@ def visualize_shotmap(player_name, compiled_data, competition_name):
         alpha=0.7
     )
     
-    ax1.text(
+    ax.text(
         x=0.54,
         y=0.27,
         s="No Goal",
@@ -314,7 +406,7 @@ def visualize_shotmap(player_name, compiled_data, competition_name):
         color="white",
         ha="left"
     )
-    ax1.scatter(
+    ax.scatter(
         x=0.51,
         y=0.29,
         s=150,
@@ -323,15 +415,15 @@ def visualize_shotmap(player_name, compiled_data, competition_name):
         linewidth=0.8
     )
 
-    # Second part of visualization, shotmap on pitch
-    ax2 = fig.add_axes([0.04, 0.25, 0.9, 0.5])
-    ax2.set_facecolor(background_color)
 
-    # Initialize a vertical pitch
-    pitch = VerticalPitch(
+def new_pitch():
+    """Returns the vertical half pitch every shotmap is drawn on"""
+    from mplsoccer import VerticalPitch
+
+    return VerticalPitch(
         pitch_type="opta",
         half=True,
-        pitch_color=background_color,
+        pitch_color=BACKGROUND_COLOR,
         pad_bottom=0.5,
         line_color="white",
         linewidth=0.75,
@@ -339,108 +431,189 @@ def visualize_shotmap(player_name, compiled_data, competition_name):
         label=True
     )
 
-    # Loop through inputted shotmap data and plot on pitch accordingly
-    for shot in compiled_data.to_dict(orient="records"):
-        x_coord = 100 - shot["x"]  # Align to pitch visualization 
-        y_coord = 100 - shot["y"]
-        if shot["situation"] != "penalty":  # Only non-penalty goals
-            pitch.scatter(
-                x_coord,
-                y_coord,
-                s=300 * shot["xg"],
-                color="red" if shot["shot_type"] == "goal" else background_color,
-                ax=ax2,
-                alpha=0.7,
-                linewidth=0.8,
-                edgecolor="white"
-            )
-    
-    pitch.draw(ax=ax2)
 
-    # Part three of visualization, shot statistics
-    ax3 = fig.add_axes([0, 0.2, 1, 0.05])
-    ax3.set_facecolor(background_color)
+def draw_shots(pitch, ax, compiled_data):
+    """Plots all non-penalty shots in one call, flipped to align to pitch visualization"""
+    import numpy as np
 
-    # Total shots
-    ax3.text(
-        x=0.225,
-        y=0.5,
-        s="Shots",
-        fontsize=20,
-        fontweight="bold",
-        color="white",
-        ha="left"
-    )
-    ax3.text(
-        x=0.225,
-        y=0,
-        s=f"{len(compiled_data)}",
-        fontsize=16,
-        color="white",
-        ha="left"
+    shots = compiled_data[compiled_data["situation"] != "penalty"]
+    return pitch.scatter(
+        100 - shots["x"].to_numpy(),
+        100 - shots["y"].to_numpy(),
+        s=300 * shots["xg"].to_numpy(),
+        color=np.where(shots["shot_type"].to_numpy() == "goal", "red", BACKGROUND_COLOR),
+        ax=ax,
+        alpha=0.7,
+        linewidth=0.8,
+        edgecolor="white"
     )
 
-    # Total goals
-    ax3.text(
-        x=0.365,
-        y=0.5,
-        s="Goals",
-        fontsize=20,
-        fontweight="bold",
-        color="white",
-        ha="left"
-    )
-    ax3.text(
-        x=0.365,
-        y=0,
-        s=f"{len(compiled_data[compiled_data["shot_type"] == "goal"])}",
-        fontsize=16,
-        color="white",
-        ha="left"
-    )
 
-    # Total xG
-    ax3.text(
-        x=0.505,
-        y=0.5,
-        s="xG",
+def shot_stats(compiled_data):
+    """Returns (label, value) pairs shown under the pitch"""
+    return [
+        ("Shots", f"{len(compiled_data)}"),
+        ("Goals", f"{len(compiled_data[compiled_data["shot_type"] == "goal"])}"),
+        ("xG", f"{compiled_data["xg"].sum():.2f}"),
+        ("xG/Shot", f"{compiled_data["xg"].sum() / len(compiled_data):.2f}"),
+    ]
+
+
+def draw_stats(ax, stats, x_positions, label_size=20, value_size=16):
+    """Draws stat labels with their values underneath at the given x positions"""
+    artists = []
+    for x, (label, value) in zip(x_positions, stats):
+        ax.text(
+            x=x,
+            y=0.5,
+            s=label,
+            fontsize=label_size,
+            fontweight="bold",
+            color="white",
+            ha="left"
+        )
+        artists.append(ax.text(
+            x=x,
+            y=0,
+            s=value,
+            fontsize=value_size,
+            color="white",
+            ha="left"
+        ))
+    return artists
+
+
+def show_figure(fig, show):
+    """Show data, regardless of whether in script file or ipynb"""
+    import matplotlib.pyplot as plt
+    import sys
+
+    if not show:
+        return
+    if "ipykernel" in sys.modules:
+        plt.close(fig)  # Avoids duplicate plots in jupyter
+    else:
+        plt.show()
+
+
+def visualize_shotmap(player_name, compiled_data, competition_name, show=True):
+    """
+    Generates shotmap visualization of given player using user shotmap data
+
+    show=False only builds the figure (for saving to file, headless use)
+    """
+    import matplotlib.pyplot as plt
+    
+    background_color = BACKGROUND_COLOR
+
+    # Set up figure
+    fig = plt.figure(figsize=(8, 12))
+    fig.patch.set_facecolor(background_color)
+
+    # First part of visualization, title & legend
+    ax1 = fig.add_axes([0, 0.7, 1, 0.2])
+    ax1.set_facecolor(background_color)
+    ax1.set_xlim(0, 1)
+    ax1.set_ylim(0, 1)
+
+    # Heading, includes name of player that was inputted 
+    ax1.text(
+        x=0.5,
+        y=0.85,
+        s=player_name,
         fontsize=20,
         fontweight="bold",
         color="white",
-        ha="left"
+        ha="center"  # Horizontal alignment
     )
-    ax3.text(
-        x=0.505,
-        y=0,
-        s=f"{compiled_data["xg"].sum():.2f}",
-        fontsize=16,
+    ax1.text(
+        x=0.5,
+        y=0.75,
+        s=f"All non-penalty shots in the {competition_name}",
+        fontsize=14,
+        fontweight="bold",
         color="white",
-        ha="left"
+        ha="center"
     )
+    draw_legend(ax1)
 
-    # Average xG per shot
-    ax3.text(
-        x=0.645,
-        y=0.5,
-        s="xG/Shot",
+    # Second part of visualization, shotmap on pitch
+    ax2 = fig.add_axes([0.04, 0.25, 0.9, 0.5])
+    ax2.set_facecolor(background_color)
+    pitch = new_pitch()
+    draw_shots(pitch, ax2, compiled_data)
+    pitch.draw(ax=ax2)
+
+    # Part three of visualization, shot statistics
+    ax3 = fig.add_axes([0, 0.2, 1, 0.05])
+    ax3.set_facecolor(background_color)
+    draw_stats(ax3, shot_stats(compiled_data), [0.225, 0.365, 0.505, 0.645])
+
+    show_figure(fig, show)
+    return fig
+
+
+def visualize_comparison(player_data, competition_name, show=True):
+    """
+    Generates side-by-side shotmaps for several players in one figure
+
+    player_data = {player_name: compiled_data}, header with legend and the
+    stats band are drawn once across all pitches
+    """
+    import matplotlib.pyplot as plt
+
+    background_color = BACKGROUND_COLOR
+    n = len(player_data)
+    width = max(8, 5 * n)
+
+    # Set up figure
+    fig = plt.figure(figsize=(width, 12))
+    fig.patch.set_facecolor(background_color)
+
+    # Shared header, same size as a single shotmap's so the legend looks the same
+    header_width = 8 / width
+    ax1 = fig.add_axes([(1 - header_width) / 2, 0.7, header_width, 0.2])
+    ax1.set_facecolor(background_color)
+    ax1.set_axis_off()  # Its frame and ticks would cut through the pitch titles
+    ax1.set_xlim(0, 1)
+    ax1.set_ylim(0, 1)
+    ax1.text(
+        x=0.5,
+        y=0.85,
+        s=" vs ".join(player_data),
         fontsize=20,
         fontweight="bold",
         color="white",
-        ha="left"
+        ha="center"
     )
-    ax3.text(
-        x=0.645,
-        y=0,
-        s=f"{compiled_data["xg"].sum() / len(compiled_data):.2f}",
-        fontsize=16,
+    ax1.text(
+        x=0.5,
+        y=0.75,
+        s=f"All non-penalty shots in the {competition_name}",
+        fontsize=14,
+        fontweight="bold",
         color="white",
-        ha="left"
+        ha="center"
     )
+    draw_legend(ax1)
 
-    # Show data, regardless of whether in script file or ipynb
-    if "ipykernel" in sys.modules:
-        plt.close(fig)  # Avoids duplicate plots in jupyter
-    else:
-        plt.show()
-    
+    # One pitch per player, side by side, narrower pitches end higher up so the stats band does too
+    ax3 = fig.add_axes([0, 0.28, 1, 0.05])
+    ax3.set_facecolor(background_color)
+    ax3.set_axis_off()  # Spans every pitch, its 0-1 ticks would run through their labels
+    for i, (player_name, compiled_data) in enumerate(player_data.items()):
+        ax2 = fig.add_axes([(i + 0.04) / n, 0.25, 0.92 / n, 0.5])
+        ax2.set_facecolor(background_color)
+        pitch = new_pitch()
+        draw_shots(pitch, ax2, compiled_data)
+        pitch.draw(ax=ax2)
+        ax2.set_title(player_name, fontsize=16, fontweight="bold", color="white")
+        # Only the outer edges keep their y labels, neighbouring pitches' labels would run together
+        ax2.tick_params(left=i == 0, labelleft=i == 0, right=i == n - 1, labelright=i == n - 1)
+
+        # Stats in the shared band, under this player's pitch
+        x_positions = [(i + offset) / n for offset in (0.1, 0.3, 0.5, 0.7)]
+        draw_stats(ax3, shot_stats(compiled_data), x_positions, label_size=14, value_size=12)
+
+    show_figure(fig, show)
     return fig
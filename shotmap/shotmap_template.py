@@ -0,0 +1,99 @@
+"""Pre-rendered shotmap background that per-player artists are blitted onto"""
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from shotmap import BACKGROUND_COLOR, draw_legend, new_pitch, draw_shots, shot_stats, draw_stats
+
+
+class ShotmapTemplate:
+    """
+    Renders the parts every shotmap shares (background, legends, pitch,
+    stat labels) once, then only draws the player's name, shots and numbers
+    on top of a copy of that buffer. Never touches pyplot, so it is headless
+
+    Example Usage:
+    template = ShotmapTemplate()
+    for player_name, compiled_data in players.items():
+        template.save(f"{player_name}.png", player_name, compiled_data, "Premier League 24/25")
+    """
+
+    def __init__(self, dpi=100, tight=True):
+        background_color = BACKGROUND_COLOR
+
+        # Same layout as visualize_shotmap, without pyplot
+        self.fig = Figure(figsize=(8, 12), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.fig.patch.set_facecolor(background_color)
+
+        ax1 = self.fig.add_axes([0, 0.7, 1, 0.2])
+        ax1.set_facecolor(background_color)
+        ax1.set_xlim(0, 1)
+        ax1.set_ylim(0, 1)
+
+        # Animated artists are left out of the background, drawn per player
+        self._title = ax1.text(x=0.5, y=0.85, s="", fontsize=20, fontweight="bold",
+                               color="white", ha="center", animated=True)
+        self._subtitle = ax1.text(x=0.5, y=0.75, s="", fontsize=14, fontweight="bold",
+                                  color="white", ha="center", animated=True)
+        draw_legend(ax1)
+
+        self._ax2 = self.fig.add_axes([0.04, 0.25, 0.9, 0.5])
+        self._ax2.set_facecolor(background_color)
+        self._pitch = new_pitch()
+        self._pitch.draw(ax=self._ax2)
+
+        ax3 = self.fig.add_axes([0, 0.2, 1, 0.05])
+        ax3.set_facecolor(background_color)
+        self._values = draw_stats(ax3, [(label, "") for label in ("Shots", "Goals", "xG", "xG/Shot")],
+                                  [0.225, 0.365, 0.505, 0.645])
+        for artist in self._values:
+            artist.set_animated(True)
+
+        if tight:
+            self._fit_tight_bbox()
+        self.canvas.draw()
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+    def _fit_tight_bbox(self):
+        """
+        Resizes the figure to savefig(bbox_inches="tight")'s bounding box,
+        tick labels sticking out of the figure included, and moves every axes
+        by its origin, so the output matches savefig pixel for pixel.
+        The box is measured with placeholder texts, a name too long for it
+        gets cut off where savefig would have widened the image
+        """
+        self._title.set_text("Player Name")
+        self._subtitle.set_text("All non-penalty shots in the Competition")
+        for artist in self._values:
+            artist.set_text("0.00")
+        bbox = self.fig.get_tightbbox(self.canvas.get_renderer()).padded(0.1)  # Inches, savefig's pad
+
+        width, height = self.fig.get_size_inches()
+        for ax in self.fig.axes:
+            x0, y0, w, h = ax.get_position(original=True).bounds
+            ax.set_position([(x0 * width - bbox.x0) / bbox.width, (y0 * height - bbox.y0) / bbox.height,
+                             w * width / bbox.width, h * height / bbox.height])
+        self.fig.set_size_inches(bbox.width, bbox.height)
+
+    def render(self, player_name, compiled_data, competition_name):
+        """Returns RGBA pixel array of a player's shotmap"""
+        self.canvas.restore_region(self._background)
+
+        self._title.set_text(player_name)
+        self._subtitle.set_text(f"All non-penalty shots in the {competition_name}")
+        for artist, (_, value) in zip(self._values, shot_stats(compiled_data)):
+            artist.set_text(value)
+        shots = draw_shots(self._pitch, self._ax2, compiled_data)
+
+        for artist in [shots, self._title, self._subtitle, *self._values]:
+            artist.axes.draw_artist(artist)
+        shots.remove()
+
+        return np.asarray(self.canvas.buffer_rgba()).copy()
+
+    def save(self, path, player_name, compiled_data, competition_name):
+        """Writes a player's shotmap to a PNG file"""
+        from PIL import Image
+
+        Image.fromarray(self.render(player_name, compiled_data, competition_name)).save(path, format="png")
@@ -0,0 +1,94 @@
+"""Shared, pooled and cached HTTP access to the SofaScore API"""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+import codes
+from response_cache import ResponseCache, IMMUTABLE
+import rate_limiter
+
+API_URL = "https://www.sofascore.com/api/v1"
+POOL_SIZE = 16  # Max keep-alive connections, should cover the largest thread pool
+EVENTS_TTL = 10 * 60  # Event list pages change every matchday
+
+_session = None
+_cache = None
+_lock = threading.Lock()
+
+
+def get_session():
+    """Returns the process-wide keep-alive session, created on first use"""
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(codes.headers)
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE))
+            _session = session
+    return _session
+
+
+def get_cache():
+    """Returns the process-wide response cache, created on first use"""
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = ResponseCache()
+    return _cache
+
+
+def cached_response(url, body):
+    """Wraps a cached body in a Response so callers can't tell it apart from a live one"""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body
+    return response
+
+
+def send(session, url, timeout, headers=None, attempts=5):
+    """
+    Sends a request once the shared SofaScore rate limiter allows it
+
+    Throttled responses (429/5xx) are retried once the slowed-down limiter
+    lets the next request through, only the last attempt's is returned
+    """
+    limiter = rate_limiter.limiter("sofascore")
+    for attempt in range(attempts):
+        limiter.acquire()
+        response = session.get(url, timeout=timeout, headers=headers)
+        limiter.feedback(response.status_code)
+        if not rate_limiter.throttled(response.status_code):
+            break
+    return response
+
+
+def get(path, session=None, timeout=10, ttl=0):
+    """
+    Requests an API path (e.g. '/event/123/shotmap') over the shared session
+
+    ttl = seconds a successful response may be served from the on-disk
+    cache, IMMUTABLE for content that never changes, 0 to bypass the cache
+    """
+    session = session or get_session()
+    url = f"{API_URL}{path}"
+    if not ttl:
+        return send(session, url, timeout)
+
+    cache = get_cache()
+    entry = cache.get(url)
+    if entry is not None and entry.fresh:
+        return cached_response(url, entry.body)
+
+    # Stale entries are revalidated, server answers 304 if nothing changed
+    headers = entry.revalidation_headers() if entry is not None else {}
+    response = send(session, url, timeout, headers)
+    if response.status_code == 304 and entry is not None:
+        cache.refresh(url, ttl)
+        return cached_response(url, entry.body)
+
+    if response.status_code == 200:
+        cache.put(url, response.content, ttl,
+                  etag=response.headers.get("ETag"),
+                  last_modified=response.headers.get("Last-Modified"))
+    return response
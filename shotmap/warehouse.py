@@ -0,0 +1,230 @@
+"""Columnar on-disk warehouse (Parquet) of every fetched shot, partitioned by competition and season"""
+
+import os
+import threading
+import uuid
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs
+import pyarrow.parquet as pq
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "warehouse")
+
+SCHEMA = pa.schema([
+    ("match_id", pa.int64()),
+    ("player_id", pa.int64()),
+    ("player_name", pa.string()),
+    ("is_home", pa.bool_()),
+    ("shot_type", pa.string()),
+    ("situation", pa.string()),
+    ("body_part", pa.string()),
+    ("x", pa.float64()),
+    ("y", pa.float64()),
+    ("xg", pa.float64()),
+])
+# Every fetched match with its shot count, so matches without shots aren't fetched again.
+# Kept under "_matches", which dataset discovery of the shots skips
+MATCHES_DIR = "_matches"
+MATCHES_SCHEMA = pa.schema([("match_id", pa.int64()), ("shots", pa.int64())])
+# ensure_matches appends small files, a partition past this many is rewritten as one
+COMPACT_FILES = 16
+PARTITIONING = ds.partitioning(
+    pa.schema([("competition", pa.string()), ("season", pa.string())]), flavor="hive"
+)
+
+
+def split_competition(competition_name):
+    """'Premier League 24/25' -> ('Premier League', '24/25')"""
+    competition, _, season = competition_name.rpartition(" ")
+    return competition, season
+
+
+def open_dataset(data_dir=DEFAULT_DIR, schema=SCHEMA):
+    """Returns the memory-mapped dataset, None if nothing has been stored yet"""
+    if not os.path.isdir(data_dir):
+        return None
+    return ds.dataset(
+        data_dir,
+        schema=schema.append(pa.field("competition", pa.string())).append(pa.field("season", pa.string())),
+        format="parquet",
+        partitioning=PARTITIONING,
+        filesystem=pyarrow.fs.LocalFileSystem(use_mmap=True),
+    )
+
+
+def query(filter=None, columns=None, data_dir=DEFAULT_DIR):
+    """
+    Returns DataFrame (compact dtypes) of stored shots matching a pyarrow
+    filter expression, partitions and row groups that can't match are never read
+
+    Example Usage:
+    query(ds.field("player_name") == "Mohamed Salah")  # Every season on record
+    query(ds.field("season") == "24/25", columns=["player_name", "xg"])
+    """
+    from shotmap import compact_dtypes
+
+    dataset = open_dataset(data_dir)
+    if dataset is None:
+        table = SCHEMA.empty_table() if columns is None else SCHEMA.empty_table().select(columns)
+    else:
+        table = dataset.to_table(filter=filter, columns=columns)
+    return compact_dtypes(table.to_pandas())
+
+
+def competition_filter(competition_name):
+    competition, season = split_competition(competition_name)
+    return (ds.field("competition") == competition) & (ds.field("season") == season)
+
+
+def stored_match_ids(competition_name, data_dir=DEFAULT_DIR):
+    """Returns set of match IDs already in the warehouse for a competition season, with or without shots"""
+    data = query(competition_filter(competition_name), columns=["match_id"], data_dir=data_dir)
+    stored = set(data["match_id"])
+
+    matches = open_dataset(os.path.join(data_dir, MATCHES_DIR), MATCHES_SCHEMA)
+    if matches is not None:
+        table = matches.to_table(filter=competition_filter(competition_name), columns=["match_id"])
+        stored.update(table.column("match_id").to_pylist())
+    return stored
+
+
+def _append(table, competition_name, data_dir):
+    competition, season = split_competition(competition_name)
+    table = table.append_column("competition", pa.array([competition] * len(table)))
+    table = table.append_column("season", pa.array([season] * len(table)))
+    ds.write_dataset(
+        table,
+        data_dir,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def write_shots(shots, competition_name, data_dir=DEFAULT_DIR):
+    """Appends shot rows (ShotStore columns) to the competition season's partition"""
+    if shots.empty:
+        return 0
+    table = pa.Table.from_pandas(shots[SCHEMA.names], schema=SCHEMA, preserve_index=False)
+    _append(table, competition_name, data_dir)
+    return len(table)
+
+
+def write_matches(shot_counts, competition_name, data_dir=DEFAULT_DIR):
+    """Records fetched matches ({match_id: number of shots}) of a competition season"""
+    if not shot_counts:
+        return 0
+    table = pa.table({"match_id": list(shot_counts), "shots": list(shot_counts.values())}, schema=MATCHES_SCHEMA)
+    _append(table, competition_name, os.path.join(data_dir, MATCHES_DIR))
+    return len(table)
+
+
+def _compact(competition_name, data_dir, schema, max_files):
+    dataset = open_dataset(data_dir, schema)
+    if dataset is None:
+        return 0
+    paths = [fragment.path for fragment in dataset.get_fragments(filter=competition_filter(competition_name))]
+    if len(paths) <= max_files:
+        return 0
+
+    table = ds.dataset(paths, schema=schema, format="parquet").to_table()
+    directory = os.path.dirname(paths[0])
+    # Written under an ignored name first, so readers never see a half-written file
+    hidden = os.path.join(directory, f".part-{uuid.uuid4().hex}-0.parquet")
+    pq.write_table(table, hidden)
+    os.replace(hidden, os.path.join(directory, os.path.basename(hidden)[1:]))
+    for path in paths:
+        os.remove(path)
+    return len(paths)
+
+
+def compact(competition_name, data_dir=DEFAULT_DIR, max_files=COMPACT_FILES):
+    """
+    Rewrites a competition season's partition as one file once it holds more
+    than max_files, returns how many files were merged
+
+    Example Usage:
+    compact("Premier League 24/25", max_files=0)  # Always merge
+    """
+    return (_compact(competition_name, data_dir, SCHEMA, max_files)
+            + _compact(competition_name, os.path.join(data_dir, MATCHES_DIR), MATCHES_SCHEMA, max_files))
+
+
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def _season_lock(competition_name, data_dir):
+    """Returns the lock serialising writes to one competition season of one warehouse"""
+    with _locks_lock:
+        return _locks.setdefault((os.path.abspath(data_dir), competition_name), threading.Lock())
+
+
+def ensure_matches(competition_name, match_ids, max_workers=8, data_dir=DEFAULT_DIR):
+    """
+    Downloads (once) and stores every match not yet in the warehouse, returns how many were added
+
+    Checking and writing happen under one lock per competition season, so
+    concurrent callers never store a match twice. Matches that downloaded
+    are stored even if others failed, then shot_store.FetchError names the
+    failed ones
+    """
+    import pandas as pd
+    import shot_store
+
+    with _season_lock(competition_name, data_dir):
+        stored = stored_match_ids(competition_name, data_dir)
+        missing = [match_id for match_id in dict.fromkeys(match_ids) if match_id not in stored]
+        if not missing:
+            return 0
+
+        store = shot_store.default_store()
+        failed = None
+        try:
+            store.fetch(missing, max_workers)
+        except shot_store.FetchError as error:
+            failed = error
+            missing = [match_id for match_id in missing if match_id not in error.errors]
+        if not missing:
+            raise failed
+
+        matches = [store.match_shots(match_id) for match_id in missing]
+        write_shots(pd.concat(matches, ignore_index=True), competition_name, data_dir)
+        # Recorded after the shots, so a crash in between only refetches matches without shots
+        write_matches({match_id: len(shots) for match_id, shots in zip(missing, matches)},
+                      competition_name, data_dir)
+        compact(competition_name, data_dir)
+        if failed is not None:
+            raise failed
+        return len(missing)
+
+
+def season_shots(player_name, competition_name, match_ids=None, data_dir=DEFAULT_DIR):
+    """
+    Returns a player's shots (SHOT_COLUMNS) in a competition season, straight from the warehouse
+
+    match_ids limits to (and orders by) the given matches
+    """
+    from shotmap import SHOT_COLUMNS, compact_dtypes
+
+    filter = competition_filter(competition_name) & (ds.field("player_name") == player_name)
+    if match_ids is not None:
+        filter = filter & ds.field("match_id").isin(list(match_ids))
+    data = query(filter, columns=["match_id"] + SHOT_COLUMNS, data_dir=data_dir)
+
+    if match_ids is not None:  # Same match order as the match list
+        order = {match_id: i for i, match_id in enumerate(match_ids)}
+        data = data.iloc[data["match_id"].map(order).argsort(kind="stable")]
+    return compact_dtypes(data[SHOT_COLUMNS].reset_index(drop=True))
+
+
+def player_totals(competition_name=None, data_dir=DEFAULT_DIR):
+    """Returns non-penalty shots, goals and xG per player, optionally for one competition season"""
+    filter = ds.field("situation") != "penalty"
+    if competition_name is not None:
+        filter = filter & competition_filter(competition_name)
+    data = query(filter, columns=["player_name", "shot_type", "xg"], data_dir=data_dir)
+    data["goal"] = data["shot_type"] == "goal"
+    totals = data.groupby("player_name").agg(shots=("xg", "size"), goals=("goal", "sum"), xg=("xg", "sum"))
+    return totals.sort_values("xg", ascending=False)
@@ -0,0 +1,12 @@
+"""Puts the flat shotmap and media modules on the import path, as running them from their folders does"""
+
+import os
+import sys
+
+import matplotlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ("shotmap", "media"):
+    sys.path.insert(0, os.path.join(ROOT, folder))
+
+matplotlib.use("Agg")  # Never open a window
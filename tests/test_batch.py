@@ -0,0 +1,78 @@
+"""Failure handling of batch rendering (no network)"""
+
+import pandas as pd
+import requests
+
+import batch
+import shot_store
+import shotmap
+import warehouse
+
+
+def test_failed_download_fails_only_that_competition(tmp_path, monkeypatch):
+    def ensure_matches(competition_name, match_ids, max_workers=8):
+        if competition_name == "LaLiga 24/25":
+            raise requests.HTTPError("503 Server Error")
+
+    monkeypatch.setattr(shotmap, "get_player_id", lambda player_name: 1)
+    monkeypatch.setattr(shotmap, "season_match_ids", lambda player_id, competition_name: [1, 2])
+    monkeypatch.setattr(warehouse, "ensure_matches", ensure_matches)
+    monkeypatch.setattr(warehouse, "season_shots",
+                        lambda *args: shotmap.compact_dtypes(pd.DataFrame(columns=shotmap.SHOT_COLUMNS)))
+
+    report = batch.batch_shotmaps([("Lamine Yamal", "LaLiga 24/25"), ("Mohamed Salah", "Premier League 24/25")],
+                                  str(tmp_path), processes=1)
+    laliga, premier_league = report
+    assert laliga["status"] == "failed" and "503" in laliga["error"]
+    assert "match_ids" not in laliga
+    assert premier_league["error"] == "Player took no shots during this competition"
+
+
+def test_failed_match_fails_only_jobs_that_need_it(tmp_path, monkeypatch):
+    match_ids = {"Mohamed Salah": [1, 2], "Cody Gakpo": [3, 4]}
+
+    def ensure_matches(competition_name, match_ids, max_workers=8):
+        raise shot_store.FetchError({2: requests.HTTPError("503 Server Error")})
+
+    monkeypatch.setattr(shotmap, "get_player_id", lambda player_name: player_name)
+    monkeypatch.setattr(shotmap, "season_match_ids", lambda player_id, competition_name: match_ids[player_id])
+    monkeypatch.setattr(warehouse, "ensure_matches", ensure_matches)
+    monkeypatch.setattr(warehouse, "season_shots",
+                        lambda *args: shotmap.compact_dtypes(pd.DataFrame(columns=shotmap.SHOT_COLUMNS)))
+
+    salah, gakpo = batch.batch_shotmaps([("Mohamed Salah", "Premier League 24/25"),
+                                         ("Cody Gakpo", "Premier League 24/25")], str(tmp_path), processes=1)
+    assert salah["status"] == "failed" and "2 (HTTPError" in salah["error"]
+    assert gakpo["error"] == "Player took no shots during this competition"  # Got past the download
+
+
+def test_live_season_watermark_saved_once_matches_are_stored(tmp_path, monkeypatch):
+    import season_dataset
+
+    saved = []
+    monkeypatch.setattr(shotmap, "get_player_id", lambda player_name: 7)
+    monkeypatch.setattr(season_dataset, "season_matches",
+                        lambda player_id, competition_name: ([1, 2], {"last_event_id": 2, "match_ids": [1, 2]}))
+    monkeypatch.setattr(season_dataset, "save_watermark",
+                        lambda player_id, competition_name, watermark: saved.append((player_id, competition_name)))
+    monkeypatch.setattr(warehouse, "ensure_matches", lambda competition_name, match_ids, max_workers=8: 2)
+    monkeypatch.setattr(warehouse, "season_shots",
+                        lambda *args: shotmap.compact_dtypes(pd.DataFrame(columns=shotmap.SHOT_COLUMNS)))
+
+    job, = batch.batch_shotmaps([("Mohamed Salah", "Premier League 25/26")], str(tmp_path), processes=1)
+    assert saved == [(7, "Premier League 25/26")]
+    assert "player_id" not in job and "match_ids" not in job
+
+
+def test_progress_is_printed_as_renders_finish(tmp_path, monkeypatch, capsys):
+    import benchmark
+
+    monkeypatch.setattr(shotmap, "get_player_id", lambda player_name: 1)
+    monkeypatch.setattr(shotmap, "season_match_ids", lambda player_id, competition_name: [1])
+    monkeypatch.setattr(warehouse, "ensure_matches", lambda competition_name, match_ids, max_workers=8: 0)
+    monkeypatch.setattr(warehouse, "season_shots",
+                        lambda *args: shotmap.compact_dtypes(benchmark.synthetic_shots(20, 0)))
+
+    job, = batch.batch_shotmaps([("Mohamed Salah", "Premier League 24/25")], str(tmp_path), processes=1)
+    assert job["status"] == "ok"
+    assert "1/1 done: Mohamed Salah (Premier League 24/25) ok" in capsys.readouterr().out
@@ -0,0 +1,72 @@
+"""Lending and closing of the browser pool (no real browsers)"""
+
+import threading
+
+import pytest
+
+from browser_pool import BrowserPool
+
+
+class FakeDriver:
+    current_url = "about:blank"
+
+    def __init__(self):
+        self.quit_calls = 0
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class FakePool(BrowserPool):
+    def _start_driver(self):
+        return FakeDriver()
+
+
+def test_idle_drivers_are_reused_and_worn_out_ones_quit():
+    pool = FakePool(size=1, max_uses=2)
+    with pool.browser() as first:
+        pass
+    with pool.browser() as second:
+        pass
+    assert second is first
+    assert first.quit_calls == 1  # Second borrow wore it out
+
+    with pool.browser() as third:
+        pass
+    assert third is not first
+
+
+def test_driver_returned_after_close_is_quit():
+    pool = FakePool(size=2)
+    idle = pool.acquire()
+    borrowed = pool.acquire()
+    pool.release(idle)
+
+    pool.close()
+    assert idle.quit_calls == 1
+    pool.release(borrowed)
+    assert borrowed.quit_calls == 1
+    assert pool._idle == [] and pool._started == 0
+
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+
+def test_close_wakes_waiting_borrowers():
+    pool = FakePool(size=1)
+    driver = pool.acquire()
+    errors = []
+
+    def borrow():
+        try:
+            pool.acquire(timeout=5)
+        except Exception as error:
+            errors.append(error)
+
+    waiter = threading.Thread(target=borrow)
+    waiter.start()
+    pool.close()
+    waiter.join(timeout=5)
+    assert [type(error) for error in errors] == [RuntimeError]
+    pool.release(driver)
+    assert driver.quit_calls == 1
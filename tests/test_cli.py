@@ -0,0 +1,62 @@
+"""Manifest handling of the command-line batch driver (no network, no rendering)"""
+
+import json
+
+import pytest
+import requests
+
+import batch
+import cli
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Stands in for batch_shotmaps, every job it gets is reported ok"""
+    jobs = []
+
+    def batch_shotmaps(batch_jobs, output_dir, **kwargs):
+        import os
+
+        os.makedirs(output_dir, exist_ok=True)
+        jobs.extend(batch_jobs)
+        return [{"player": player_name, "competition": competition_name, "status": "ok",
+                 "path": None, "error": None, "seconds": 0.0}
+                for player_name, competition_name in batch_jobs]
+
+    monkeypatch.setattr(batch, "batch_shotmaps", batch_shotmaps)
+    return jobs
+
+
+def write_manifest(tmp_path, entries):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps(entries))
+    return str(path)
+
+
+def test_failed_team_lookup_is_a_failed_job(tmp_path, monkeypatch, rendered):
+    def team_jobs(team_id, competition_name):
+        raise requests.HTTPError("503 Server Error")
+
+    monkeypatch.setattr(batch, "team_jobs", team_jobs)
+    manifest = write_manifest(tmp_path, [{"player": "mohamed salah", "competition": "premier league 24/25"},
+                                         {"team": 44, "competition": "premier league 24/25"}])
+    output_dir = tmp_path / "out"
+
+    assert cli.main([manifest, "-o", str(output_dir)]) == 1
+    assert rendered == [("Mohamed Salah", "Premier League 24/25")]
+    report = json.loads((output_dir / "report.json").read_text())
+    assert [(job["player"], job["status"]) for job in report] == [("team 44", "failed"),
+                                                                    ("Mohamed Salah", "ok")]
+    assert "503" in report[0]["error"]
+
+
+def test_bad_manifest_exits_with_usage_error(tmp_path, rendered):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main([str(tmp_path / "missing.json")])
+    assert exit_info.value.code == 2
+
+    manifest = write_manifest(tmp_path, [{"team": "Liverpool", "competition": "Premier League 24/25"}])
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main([manifest])
+    assert exit_info.value.code == 2
+    assert rendered == []
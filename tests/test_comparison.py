@@ -0,0 +1,32 @@
+"""Side-by-side comparison figure and its input checks (no network)"""
+
+import matplotlib.pyplot as plt
+import pytest
+
+import benchmark
+import shotmap
+
+
+@pytest.mark.parametrize("player_names", [[], ["Erling Haaland"], ["A", "B", "C", "D", "E"]])
+def test_compare_needs_two_to_four_players(player_names):
+    with pytest.raises(ValueError):
+        shotmap.compare_shotmaps(player_names, "Premier League 24/25", show=False)
+
+
+def test_normalize_competition():
+    assert shotmap.normalize_competition(" uefa champions league 24/25 ") == "UEFA Champions League 24/25"
+    assert shotmap.normalize_competition("laliga 24/25") == "LaLiga 24/25"
+    assert shotmap.normalize_inputs("mohamed salah", "premier league 24/25") == ("Mohamed Salah", "Premier League 24/25")
+
+
+def test_only_outer_pitches_keep_y_labels():
+    player_data = {f"Player {i}": shotmap.compact_dtypes(benchmark.synthetic_shots(20, i)) for i in range(4)}
+    fig = shotmap.visualize_comparison(player_data, "Premier League 24/25", show=False)
+    header, stats, *pitches = fig.axes
+    assert not header.axison and not stats.axison
+
+    labelled = [(any(tick.label1.get_visible() for tick in ax.yaxis.get_major_ticks()),
+                 any(tick.label2.get_visible() for tick in ax.yaxis.get_major_ticks()))
+                for ax in pitches]
+    assert labelled == [(True, False), (False, False), (False, False), (False, True)]
+    plt.close(fig)
@@ -0,0 +1,101 @@
+"""Tests of the perceptual-hash image index"""
+
+import io
+import random
+
+from PIL import Image, ImageDraw
+
+import hash_index
+
+
+def brute_force(keys, key, max_distance):
+    return sorted((bin(key ^ other).count("1"), value) for value, other in keys.items()
+                  if bin(key ^ other).count("1") <= max_distance)
+
+
+def test_multi_index_search_matches_brute_force():
+    rng = random.Random(0)
+    hashes = hash_index.MultiIndexHash(max_distance=8)
+    keys = {}
+    for value in range(2000):
+        keys[value] = rng.getrandbits(64)
+        hashes.add(keys[value], value)
+
+    # Random queries plus near copies of stored hashes, flipping up to 8 bits
+    queries = [rng.getrandbits(64) for _ in range(50)]
+    for value in range(50):
+        flips = rng.sample(range(64), rng.randint(0, 8))
+        queries.append(keys[value] ^ sum(1 << bit for bit in flips))
+
+    for query in queries:
+        assert hashes.search(query) == brute_force(keys, query, 8)
+
+
+def test_multi_index_remove_and_replace():
+    hashes = hash_index.MultiIndexHash(max_distance=8)
+    hashes.add(0xFF, "a.png")
+    hashes.add(0xFF00, "a.png")  # Re-adding a value replaces its hash
+    assert hashes.search(0xFF) == []
+    assert hashes.search(0xFF01) == [(1, "a.png")]
+
+    hashes.remove("a.png")
+    assert len(hashes) == 0 and hashes.search(0xFF00) == []
+
+
+def photo(seed, size=(320, 240)):
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        draw.ellipse([x, y, x + rng.randrange(20, 120), y + rng.randrange(20, 120)],
+                     fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    return image
+
+
+def encode(image, quality=90):
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def test_index_finds_rescaled_copy_and_persists(tmp_path):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    for seed in range(5):
+        photo(seed).save(folder / f"player-{seed}.png")
+
+    index = hash_index.HashIndex(str(tmp_path / "hashes.db"))
+    assert index.scan([str(folder)]) == (5, 0)
+
+    copy = encode(photo(3).resize((160, 120)), quality=60)
+    assert index.find(copy) == [str(folder / "player-3.png")]
+    assert index.find(encode(photo(99))) == []
+
+    # Reopened index knows every file and doesn't hash them again
+    reopened = hash_index.HashIndex(str(tmp_path / "hashes.db"))
+    assert len(reopened) == 5 and reopened.scan([str(folder)]) == (0, 0)
+
+    (folder / "player-3.png").unlink()
+    assert reopened.scan([str(folder)]) == (0, 1)
+    assert reopened.find(copy) == []
+
+
+def test_index_remembers_source_urls(tmp_path):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    path = folder / "player-1.png"
+    photo(1).save(path)
+
+    index = hash_index.HashIndex(str(tmp_path / "hashes.db"))
+    index.add(str(path), url="https://example.com/1.jpg")
+    index.add(str(path), url="data:image/jpeg;base64,AAAA")  # Inline thumbnails aren't kept
+    assert index.url_path("https://example.com/1.jpg") == str(path)
+    assert index.url_path("data:image/jpeg;base64,AAAA") is None
+
+    reopened = hash_index.HashIndex(str(tmp_path / "hashes.db"))
+    assert reopened.url_path("https://example.com/1.jpg") == str(path)
+
+    path.unlink()
+    reopened.scan([str(folder)])
+    assert reopened.url_path("https://example.com/1.jpg") is None
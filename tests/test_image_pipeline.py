@@ -0,0 +1,59 @@
+"""Staged scraping pipeline with a fake browser pool (no network)"""
+
+from contextlib import contextmanager
+
+import image_pipeline
+
+
+class FakePool:
+    size = 2
+
+    @contextmanager
+    def browser(self):
+        yield None
+
+
+def test_known_urls_are_never_downloaded(monkeypatch):
+    downloaded = []
+
+    def download(session, limiter, src, timeout=10):
+        downloaded.append(src)
+        return src.encode()
+
+    def harvest(browser, player, club):
+        return [{"src": f"https://example.com/{player}/{i}.jpg"} for i in range(3)]
+
+    def known(item):
+        return {0: True, 1: False}.get(item["index"])  # First saved before, second saved for someone else
+
+    monkeypatch.setattr(image_pipeline, "download", download)
+    saved = image_pipeline.run_pipeline([("Alex Iwobi", "Fulham"), ("Kyle Walker", "Manchester City")],
+                                        harvest, lambda item, content: True, FakePool(), known=known)
+
+    assert sorted(downloaded) == ["https://example.com/Alex Iwobi/2.jpg", "https://example.com/Kyle Walker/2.jpg"]
+    assert [(item["player"], item["index"]) for item in saved] == [
+        ("Alex Iwobi", 0), ("Alex Iwobi", 2), ("Kyle Walker", 0), ("Kyle Walker", 2)]
+
+
+def test_download_worker_survives_errors(monkeypatch):
+    import threading
+
+    def harvest(browser, player, club):
+        return [{"src": f"https://example.com/{player}/{i}.jpg"} for i in range(6)]
+
+    def known(item):
+        if item["index"] == 0:
+            raise OSError("index locked")
+        return None
+
+    monkeypatch.setattr(image_pipeline, "download", lambda session, limiter, src, timeout=10: src.encode())
+    result = []
+    # One downloader and tiny queues, so a dead worker would block the browsers forever
+    thread = threading.Thread(target=lambda: result.append(image_pipeline.run_pipeline(
+        [("Alex Iwobi", "Fulham")], harvest, lambda item, content: True, FakePool(),
+        downloaders=1, queue_size=1, known=known)), daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert [item["index"] for item in result[0]] == [1, 2, 3, 4, 5]
@@ -0,0 +1,36 @@
+"""Batched LLM scoring of batch images, outside the pipeline's writer (no network)"""
+
+import queue
+import threading
+
+import phase2
+import tone
+from prefilter import Prefilter
+from rate_limiter import RateLimiter
+from test_prefilter import photo
+
+
+def test_scorer_sends_several_images_per_request(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "batch_images").mkdir()
+    model = tone.MockModel("Neutral")
+    classifier = tone.ToneClassifier(model, batch_size=5, max_workers=2,
+                                     limiter=RateLimiter(rate=1000, burst=100, max_rate=1000))
+    candidates = Prefilter()
+    scoring = queue.Queue()
+    saved = []
+    contents = [photo(seed) for seed in range(11)] + [photo(0)]  # Last is a copy of the first
+    for i, content in enumerate(contents):
+        item = {"player": "Alex Iwobi", "index": i, "order": 0, "src": f"https://example.com/{i}.jpg"}
+        assert not phase2.queue_batch_image(item, content, candidates, None, scoring)
+    scoring.put(None)
+    # Started once everything is queued, so the copy is only caught when saving
+    scorer = threading.Thread(target=phase2.score_batch_images,
+                              args=(scoring, candidates, None, classifier, 10, saved))
+    scorer.start()
+    scorer.join()
+
+    assert (model.requests, model.images) == (3, 12)  # Chunks of 10 and 2, five images per request
+    assert sorted(item["index"] for item in saved) == list(range(11))
+    assert candidates.rejected == {"duplicate": 1}
+    assert len(list((tmp_path / "batch_images").iterdir())) == 11
@@ -0,0 +1,37 @@
+"""Tests of the local player ID index (no network)"""
+
+import player_search
+import shotmap
+from player_index import PlayerIndex, normalize_name
+
+
+def test_lookup_ignores_accents_and_case(tmp_path):
+    index = PlayerIndex(str(tmp_path / "players.db"))
+    index.add("Kylian Mbappé", "826643")
+    index.add("Morten Hjulmand Nørgaard", "792046")
+
+    assert index.lookup("kylian mbappe") == "826643"
+    assert index.lookup("  KYLIAN   MBAPPÉ ") == "826643"
+    assert index.lookup("morten hjulmand norgaard") == "792046"
+    assert normalize_name("Nørgaard") == normalize_name("NORGAARD") == "norgaard"
+    assert index.lookup("Erling Haaland") is None
+
+
+def test_csv_round_trip(tmp_path):
+    index = PlayerIndex(str(tmp_path / "players.db"))
+    index.add_many([("Kylian Mbappé", 826643), ("Mohamed Salah", "159665")])
+    assert index.export_csv(str(tmp_path / "players.csv")) == 2
+
+    copy = PlayerIndex(str(tmp_path / "copy.db"))
+    assert copy.import_csv(str(tmp_path / "players.csv")) == 2
+    assert copy.all() == index.all() == [("Kylian Mbappé", "826643"), ("Mohamed Salah", "159665")]
+
+
+def test_get_player_id_uses_index_before_searching(tmp_path, monkeypatch):
+    def resolve_player_id(player_name):
+        raise AssertionError("searched SofaScore for a player already in the index")
+
+    monkeypatch.setattr(player_search, "resolve_player_id", resolve_player_id)
+    index = PlayerIndex(str(tmp_path / "players.db"))
+    index.add("Kylian Mbappé", "826643")
+    assert shotmap.get_player_id("kylian mbappe", index=index) == "826643"
@@ -0,0 +1,51 @@
+"""Ranking of SofaScore search candidates and bulk resolution (no network)"""
+
+import player_search
+import sofascore
+from player_index import PlayerIndex
+from player_search import rank_candidates
+
+
+def player(player_id, name, team=None, position=None, short_name=None):
+    return {"id": player_id, "name": name, "shortName": short_name,
+            "team": {"name": team} if team else None, "position": position}
+
+
+def test_exact_name_beats_partial():
+    candidates = [player(1, "Danilo Pereira"), player(2, "Danilo")]
+    assert [c["id"] for c in rank_candidates("danilo", candidates)] == [2, 1]
+
+    # Accents and case don't matter, short names count as exact
+    candidates = [player(3, "Kylian Mbappe Lottin"), player(4, "Kylian Mbappé Lottin", short_name="K. Mbappé")]
+    assert rank_candidates("k. mbappe", candidates)[0]["id"] == 4
+
+
+def test_team_then_position_break_ties():
+    candidates = [player(1, "Danilo", "Palmeiras", "M"), player(2, "Danilo", "Juventus", "M"),
+                  player(3, "Danilo", "Juventus", "D")]
+    assert [c["id"] for c in rank_candidates("Danilo", candidates, team="juventus")] == [2, 3, 1]
+    assert [c["id"] for c in rank_candidates("Danilo", candidates, team="Juventus", position="d")] == [3, 2, 1]
+    assert [c["id"] for c in rank_candidates("Danilo", candidates)] == [1, 2, 3]  # SofaScore's order
+
+
+def test_candidate_without_team():
+    candidates = [{"id": 5, "name": "Danilo", "team": None}, player(6, "Danilo", "Juventus")]
+    assert [c["id"] for c in rank_candidates("Danilo", candidates, team="Juventus")] == [6, 5]
+
+
+def test_resolve_player_ids_searches_only_unknown_names(tmp_path, monkeypatch):
+    index = PlayerIndex(str(tmp_path / "players.db"))
+    index.add("Mohamed Salah", "159665")
+    searched = []
+
+    def search_players(query, session=None):
+        searched.append(query)
+        return [player(934235, "Cody Gakpo")] if query == "Cody Gakpo" else []
+
+    monkeypatch.setattr(player_search, "search_players", search_players)
+    monkeypatch.setattr(sofascore, "get_session", lambda: None)
+    resolved = player_search.resolve_player_ids(["Mohamed Salah", "Cody Gakpo", "Nobody"], index=index)
+
+    assert resolved == {"Mohamed Salah": "159665", "Cody Gakpo": "934235", "Nobody": None}
+    assert sorted(searched) == ["Cody Gakpo", "Nobody"]
+    assert index.lookup("cody gakpo") == "934235"  # Remembered for next time
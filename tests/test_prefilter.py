@@ -0,0 +1,58 @@
+"""Cheap image checks and when they remember an image (no network)"""
+
+import io
+import sys
+
+import numpy as np
+from PIL import Image
+
+import phase2
+import tone
+from prefilter import Prefilter
+from rate_limiter import RateLimiter
+
+
+def photo(seed=0, size=(640, 480)):
+    """Returns PNG bytes of a sharp noise image, large enough to pass every check"""
+    pixels = np.random.default_rng(seed).integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="png")
+    return buffer.getvalue()
+
+
+def test_rejects_small_and_odd_images():
+    candidates = Prefilter()
+    assert candidates.check("Alex Iwobi", b"tiny")[:2] == (False, "too small")
+    assert candidates.check("Alex Iwobi", photo(size=(1600, 500)))[:2] == (False, "aspect ratio")
+    assert candidates.rejected == {"too small": 1, "aspect ratio": 1}
+
+
+def test_duplicates_only_of_kept_images():
+    candidates = Prefilter()
+    content = photo()
+    ok, reason, image_hash = candidates.check("Alex Iwobi", content)
+    assert (ok, reason) == (True, None)
+    assert candidates.check("Alex Iwobi", content)[0]  # Not kept yet, still a candidate
+
+    candidates.keep("Alex Iwobi", image_hash)
+    assert candidates.check("Alex Iwobi", content)[:2] == (False, "duplicate")
+    assert candidates.check("Kyle Walker", content)[0]  # Per player
+
+
+def test_image_turned_down_by_llm_is_not_kept(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "ipykernel", sys)  # Takes the Jupyter branch
+    limiter = RateLimiter(rate=1000, burst=100, max_rate=1000)
+    candidates = Prefilter()
+    content = photo()
+
+    item = {"player": "Alex Iwobi", "index": 0}
+    turned_down = tone.ToneClassifier(tone.MockModel("Positive", strength=50), limiter=limiter)
+    assert not phase2.save_batch_image(item, content, candidates, classifier=turned_down)
+    assert candidates.hashes == {}
+    assert candidates.check("Alex Iwobi", content)[0]
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "batch_images").mkdir()
+    accepted = tone.ToneClassifier(tone.MockModel("Neutral"), limiter=limiter)
+    assert phase2.save_batch_image(item, content, candidates, classifier=accepted)
+    assert candidates.check("Alex Iwobi", content)[:2] == (False, "duplicate")
@@ -0,0 +1,54 @@
+"""Tests of the adaptive token-bucket rate limiter"""
+
+import pytest
+
+from rate_limiter import RateLimiter
+
+
+def test_throttled_responses_halve_rate_and_healthy_ones_raise_it():
+    limiter = RateLimiter(rate=8, min_rate=1, max_rate=9, increase=0.5)
+    limiter.feedback(429)
+    assert limiter.rate == 4
+    limiter.feedback(503)
+    assert limiter.rate == 2
+    limiter.feedback(200)
+    assert limiter.rate == 2.5
+    limiter.feedback(404)  # Client errors aren't the server pushing back
+    assert limiter.rate == 2.5
+
+    for _ in range(10):
+        limiter.feedback(429)
+    assert limiter.rate == 1  # Never below min_rate
+    for _ in range(100):
+        limiter.feedback(200)
+    assert limiter.rate == 9  # Never above max_rate
+
+
+def test_burst_is_available_straight_away():
+    limiter = RateLimiter(rate=0.001, burst=3)
+    for _ in range(3):
+        limiter.acquire()  # Would block for ~1000 s if the bucket was empty
+
+
+def test_call_retries_on_throttling_exceptions():
+    limiter = RateLimiter(rate=1000, burst=10, max_rate=1000)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise TimeoutError
+        return "ok"
+
+    assert limiter.call(flaky, retry_on=(TimeoutError,)) == "ok"
+    assert len(attempts) == 3
+
+
+def test_call_gives_up_after_attempts():
+    limiter = RateLimiter(rate=1000, burst=10, min_rate=1000, max_rate=1000)
+
+    def always_fails():
+        raise TimeoutError
+
+    with pytest.raises(TimeoutError):
+        limiter.call(always_fails, retry_on=(TimeoutError,), attempts=3)
@@ -0,0 +1,48 @@
+"""Tests of the on-disk SofaScore response cache"""
+
+import time
+
+from response_cache import ResponseCache, IMMUTABLE
+
+
+def test_put_and_get_fresh_entry(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    cache.put("https://x/1", b"body", ttl=60, etag='"abc"')
+
+    entry = cache.get("https://x/1")
+    assert entry.body == b"body" and entry.fresh
+    assert entry.revalidation_headers() == {"If-None-Match": '"abc"'}
+    assert cache.get("https://x/2") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_expired_entry_is_stale_until_refreshed(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    cache.put("https://x/1", b"body", ttl=-1)
+    assert not cache.get("https://x/1").fresh
+
+    cache.refresh("https://x/1", ttl=60)
+    assert cache.get("https://x/1").fresh
+    assert cache.stats()["revalidated"] == 1
+
+
+def test_immutable_entry_never_expires(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    cache.put("https://x/1", b"body", ttl=IMMUTABLE)
+    entry = cache.get("https://x/1")
+    assert entry.expires_at is None and entry.fresh
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_bytes=20)
+    cache.put("https://x/a", b"a" * 8, ttl=60)
+    time.sleep(0.01)
+    cache.put("https://x/b", b"b" * 8, ttl=60)
+    time.sleep(0.01)
+    cache.get("https://x/a")  # a is now more recently used than b
+    time.sleep(0.01)
+    cache.put("https://x/c", b"c" * 8, ttl=60)
+
+    assert cache.get("https://x/b") is None
+    assert cache.get("https://x/a") is not None and cache.get("https://x/c") is not None
+    assert cache.stats()["bytes"] == 16
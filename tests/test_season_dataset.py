@@ -0,0 +1,74 @@
+"""Tests of the incremental refresh watermark"""
+
+from season_dataset import advance_watermark
+
+
+def event(event_id, timestamp, status="finished"):
+    return {"id": event_id, "startTimestamp": timestamp, "status": {"type": status}}
+
+
+def test_moves_to_newest_finished_event():
+    watermark = {"last_event_id": 1, "last_timestamp": 100}
+    events = [event(2, 200), event(3, 300)]
+    assert advance_watermark(watermark, events, [1, 2, 3]) == {
+        "last_event_id": 3, "last_timestamp": 300, "match_ids": [1, 2, 3]}
+
+
+def test_never_moves_past_match_in_progress():
+    watermark = {"last_event_id": 1, "last_timestamp": 100}
+    events = [event(2, 200), event(3, 300, "inprogress"), event(4, 400)]
+    assert advance_watermark(watermark, events, [1, 2])["last_event_id"] == 2
+
+
+def test_no_new_events_keeps_watermark():
+    watermark = {"last_event_id": 1, "last_timestamp": 100}
+    assert advance_watermark(watermark, [], [1]) == {**watermark, "match_ids": [1]}
+
+
+def test_never_moves_past_match_not_started():
+    watermark = {"last_event_id": 1, "last_timestamp": 100}
+    events = [event(2, 200), event(3, 300, "notstarted")]
+    assert advance_watermark(watermark, events, [1, 2])["last_event_id"] == 2
+
+
+def test_postponed_and_canceled_matches_do_not_hold_back():
+    watermark = {"last_event_id": 1, "last_timestamp": 100}
+    events = [event(2, 200, "postponed"), event(3, 300, "canceled"), event(4, 400)]
+    assert advance_watermark(watermark, events, [1, 4])["last_event_id"] == 4
+
+    # Settled themselves, so the newest of them can be the watermark
+    assert advance_watermark(watermark, events[:2], [1])["last_event_id"] == 3
+
+
+def test_live_season_only_pages_back_to_watermark(tmp_path, monkeypatch):
+    import season_dataset
+    import shotmap
+
+    full_listings = []
+    events = [{"id": 2, "startTimestamp": 200, "season": {"name": "Premier League 25/26"},
+               "status": {"type": "finished"}}]
+    monkeypatch.setattr(shotmap, "season_end", lambda competition_name: float("inf"))
+    monkeypatch.setattr(shotmap, "season_start", lambda competition_name: 0)
+    monkeypatch.setattr(shotmap, "season_match_ids",
+                        lambda player_id, competition_name: full_listings.append(player_id) or [1, 2])
+    monkeypatch.setattr(season_dataset, "new_events", lambda player_id, watermark, max_pages=50: list(events))
+
+    directory = str(tmp_path)
+    match_ids, watermark = season_dataset.season_matches(7, "Premier League 25/26", directory)
+    assert match_ids == [1, 2] and full_listings == [7]
+    season_dataset.save_watermark(7, "Premier League 25/26", watermark, directory)
+
+    events.append({"id": 3, "startTimestamp": 300, "season": {"name": "Premier League 25/26"},
+                   "status": {"type": "finished"}})
+    match_ids, watermark = season_dataset.season_matches(7, "Premier League 25/26", directory)
+    assert match_ids == [1, 2, 3] and full_listings == [7]  # No second full listing
+    assert watermark["last_event_id"] == 3
+
+
+def test_finished_season_has_no_watermark(monkeypatch):
+    import season_dataset
+    import shotmap
+
+    monkeypatch.setattr(shotmap, "season_end", lambda competition_name: 0)
+    monkeypatch.setattr(shotmap, "season_match_ids", lambda player_id, competition_name: [1, 2])
+    assert season_dataset.season_matches(7, "Premier League 24/25") == ([1, 2], None)
@@ -0,0 +1,58 @@
+"""Tests of the GUI's in-process session cache"""
+
+import pandas as pd
+
+from session_cache import SessionCache
+
+
+def data(rows=10):
+    return pd.DataFrame({"xg": [0.1] * rows})
+
+
+def entry_size(compiled_data, preview=None):
+    return SessionCache._size({"compiled_data": compiled_data, "preview": preview})
+
+
+def test_key_is_normalized():
+    cache = SessionCache()
+    cache.put("mohamed salah", "laliga 24/25", data())
+    assert SessionCache.key("mohamed salah", "laliga 24/25") == ("Mohamed Salah", "LaLiga 24/25")
+    assert cache.get("Mohamed Salah", "LaLiga 24/25") is not None
+    assert cache.get("Mohamed Salah", "Premier League 24/25") is None
+
+
+def test_evicts_least_recently_used():
+    cache = SessionCache(max_bytes=2 * entry_size(data()))
+    cache.put("A", "Premier League 24/25", data())
+    cache.put("B", "Premier League 24/25", data())
+    cache.get("A", "Premier League 24/25")  # A is now more recently used than B
+    cache.put("C", "Premier League 24/25", data())
+
+    assert cache.get("B", "Premier League 24/25") is None
+    assert cache.get("A", "Premier League 24/25") is not None and cache.get("C", "Premier League 24/25") is not None
+    assert cache.size == 2 * entry_size(data())
+
+
+def test_entry_larger_than_max_bytes_is_dropped():
+    cache = SessionCache(max_bytes=entry_size(data()))
+    cache.put("A", "Premier League 24/25", data())
+    cache.put("B", "Premier League 24/25", data(1000))
+    assert cache.get("B", "Premier League 24/25") is None
+    assert cache.get("A", "Premier League 24/25") is not None  # Not evicted to make room
+
+    cache.put("A", "Premier League 24/25", data(1000))  # Replacing with an oversized entry drops the old one
+    assert cache.get("A", "Premier League 24/25") is None and cache.size == 0
+
+
+def test_set_preview_resizes_entry():
+    cache = SessionCache(max_bytes=2 * entry_size(data()) + 100)
+    cache.put("A", "Premier League 24/25", data())
+    cache.put("B", "Premier League 24/25", data())
+    cache.set_preview("A", "Premier League 24/25", b"p" * 150)
+
+    assert cache.get("A", "Premier League 24/25")[1] == b"p" * 150
+    assert cache.get("B", "Premier League 24/25") is None  # Evicted once the preview pushed past max_bytes
+    assert cache.size == entry_size(data(), b"p" * 150)
+
+    cache.set_preview("B", "Premier League 24/25", b"p")  # Not cached, nothing to add to
+    assert cache.get("B", "Premier League 24/25") is None
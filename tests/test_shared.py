@@ -0,0 +1,20 @@
+"""Media code shares the shotmap helpers' module instances"""
+
+import os
+import subprocess
+import sys
+
+import shared
+
+
+def test_load_returns_the_imported_module():
+    import rate_limiter
+
+    assert shared.load("rate_limiter") is rate_limiter
+
+
+def test_load_works_without_shotmap_on_sys_path():
+    code = ("import sys; import shared; limiter = shared.load('rate_limiter'); "
+            "assert sys.modules['rate_limiter'] is limiter; "
+            "assert not any(path.endswith('shotmap') for path in sys.path)")
+    subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(shared.__file__), check=True)
@@ -0,0 +1,76 @@
+"""Tests of the match-level shot store (no network)"""
+
+import pytest
+import requests
+
+import shotmap
+import sofascore
+from shot_store import FetchError, ShotStore
+
+
+def shot(name, shot_type="goal"):
+    return {"player": {"id": 1, "name": name}, "isHome": True, "shotType": shot_type,
+            "situation": "regular", "bodyPart": "right-foot",
+            "playerCoordinates": {"x": 10.0, "y": 50.0}, "xg": 0.3}
+
+
+@pytest.fixture
+def shotmaps(monkeypatch):
+    """Serves shotmaps from a dict, raises for match IDs mapped to an exception"""
+    served = {}
+
+    def get_match_shotmap(match_id, session=None):
+        result = served[match_id]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(shotmap, "get_match_shotmap", get_match_shotmap)
+    monkeypatch.setattr(sofascore, "get_session", lambda: None)
+    return served
+
+
+def test_fetch_stores_each_match_once(shotmaps):
+    shotmaps.update({1: [shot("Salah")], 2: [shot("Gakpo"), shot("Salah", "miss")]})
+    store = ShotStore()
+    assert store.fetch([1, 2, 1]) == 2
+    assert store.fetch([1, 2]) == 0
+    assert list(store.player_shots("Salah", [1, 2])["shot_type"]) == ["goal", "miss"]
+
+
+def test_failed_download_is_not_stored_as_empty_match(shotmaps):
+    shotmaps.update({1: [shot("Salah")], 2: requests.HTTPError("503 Server Error")})
+    store = ShotStore()
+    with pytest.raises(FetchError) as failure:
+        store.fetch([1, 2])
+    assert list(failure.value.errors) == [2]
+    assert isinstance(failure.value.errors[2], requests.HTTPError)
+    assert 1 in store
+    assert 2 not in store
+
+    shotmaps[2] = [shot("Salah", "save")]  # Retried on the next fetch
+    assert store.fetch([1, 2]) == 1
+    assert len(store.player_shots("Salah", [1, 2])) == 2
+
+
+def test_unknown_categories_become_other(shotmaps):
+    shotmaps[1] = [shot("Salah"), shot("Salah", "woodwork")]
+    store = ShotStore()
+    assert list(store.match_shots(1)["shot_type"]) == ["goal", "woodwork"]  # Raw, as the warehouse stores it
+    compact = store.player_shots("Salah", [1])
+    assert list(compact["shot_type"]) == ["goal", shotmap.OTHER]
+    assert compact["shot_type"].notna().all()
+
+
+def test_missing_fields_are_stored_as_nulls(shotmaps):
+    odd = shot("Salah")
+    del odd["xg"], odd["playerCoordinates"]
+    odd["player"] = None
+    shotmaps[1] = [shot("Salah"), odd]
+    store = ShotStore()
+    assert store.fetch([1]) == 1
+
+    data = store.match_shots(1)
+    assert data["player_name"].isna().tolist() == [False, True]
+    assert data["xg"].isna().tolist() == [False, True]
+    assert len(store.player_shots("Salah", [1])) == 1
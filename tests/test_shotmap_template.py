@@ -0,0 +1,26 @@
+"""The blitted template against a full savefig render"""
+
+import io
+
+import numpy as np
+import matplotlib.pyplot as plt
+from PIL import Image
+
+import benchmark
+import shotmap
+from shotmap_template import ShotmapTemplate
+
+
+def test_template_matches_tight_savefig():
+    template = ShotmapTemplate()
+    for player_name, seed in [("Mohamed Salah", 1), ("Bo", 2)]:
+        data = shotmap.compact_dtypes(benchmark.synthetic_shots(60, seed))
+        fig = shotmap.visualize_shotmap(player_name, data, "Premier League 24/25", show=False)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", bbox_inches="tight")
+        plt.close(fig)
+
+        expected = np.asarray(Image.open(buffer).convert("RGBA"))
+        rendered = template.render(player_name, data, "Premier League 24/25")
+        assert rendered.shape == expected.shape
+        assert (rendered == expected).all()
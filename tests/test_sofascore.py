@@ -0,0 +1,68 @@
+"""Tests of the pooled, rate limited SofaScore client (no network)"""
+
+import json
+
+import requests
+
+import rate_limiter
+import sofascore
+
+
+class FakeSession:
+    """Answers with the given status codes in turn"""
+
+    def __init__(self, *status_codes):
+        self.status_codes = list(status_codes)
+        self.calls = 0
+
+    def get(self, url, timeout=None, headers=None):
+        response = requests.Response()
+        response.status_code = self.status_codes[min(self.calls, len(self.status_codes) - 1)]
+        response._content = b"{}"
+        self.calls += 1
+        return response
+
+
+def fast_limiter(monkeypatch):
+    limiter = rate_limiter.RateLimiter(rate=1000, burst=100, min_rate=1000, max_rate=1000)
+    monkeypatch.setattr(rate_limiter, "limiter", lambda service: limiter)
+
+
+def test_send_retries_throttled_responses(monkeypatch):
+    fast_limiter(monkeypatch)
+    session = FakeSession(429, 503, 200)
+    assert sofascore.send(session, "https://x", 10).status_code == 200
+    assert session.calls == 3
+
+
+def test_send_returns_last_throttled_response_after_attempts(monkeypatch):
+    fast_limiter(monkeypatch)
+    session = FakeSession(429)
+    assert sofascore.send(session, "https://x", 10, attempts=3).status_code == 429
+    assert session.calls == 3
+
+
+def test_send_does_not_retry_client_errors(monkeypatch):
+    fast_limiter(monkeypatch)
+    session = FakeSession(404)
+    assert sofascore.send(session, "https://x", 10).status_code == 404
+    assert session.calls == 1
+
+
+def test_season_match_ids_raises_instead_of_returning_partial_list(monkeypatch, tmp_path):
+    import pytest
+    import shotmap
+    from response_cache import ResponseCache
+
+    monkeypatch.setattr(sofascore, "get_cache", lambda: ResponseCache(str(tmp_path / "cache.db")))
+
+    def get(path, session=None, timeout=10, ttl=0):
+        response = FakeSession(200 if path.endswith("/0") else 503).get(path)
+        event = {"id": 1, "season": {"name": "Premier League 24/25"},
+                 "status": {"type": "finished"}, "startTimestamp": 2_000_000_000}
+        response._content = json.dumps({"events": [event], "hasNextPage": True}).encode()
+        return response
+
+    monkeypatch.setattr(sofascore, "get", get)
+    with pytest.raises(requests.HTTPError):
+        shotmap.season_match_ids(1, "Premier League 24/25")
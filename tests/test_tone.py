@@ -0,0 +1,99 @@
+"""Offline tests of batched tone classification against the mock model"""
+
+import json
+
+import pytest
+from PIL import Image
+
+import tone
+import tone_cache
+from rate_limiter import RateLimiter
+
+
+def classifier(model, **kwargs):
+    """Classifier that isn't paced like the real Gemini API"""
+    return tone.ToneClassifier(model, limiter=RateLimiter(rate=1000, burst=100, max_rate=1000), **kwargs)
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for i in range(12):
+        path = tmp_path / f"player-{i}.png"
+        Image.new("RGB", (16, 16), (i * 20, 0, 0)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def test_parse_results_orders_by_image_label():
+    text = json.dumps([
+        {"image": 2, "tone": "negative", "strength": "40", "quality": 3},
+        {"image": 1, "tone": "Neutral", "strength": 1, "quality": 2},
+    ])
+    assert tone.parse_results(text, 2) == [
+        {"tone": "Neutral", "strength": 1, "quality": 2},
+        {"tone": "Negative", "strength": 40, "quality": 3},
+    ]
+
+
+def test_parse_results_strips_code_fence():
+    text = '```json\n[{"image": 1, "tone": "Positive", "strength": 9, "quality": 8}]\n```'
+    assert tone.parse_results(text, 1) == [{"tone": "Positive", "strength": 9, "quality": 8}]
+
+
+def test_parse_results_rejects_missing_image_and_unknown_tone():
+    with pytest.raises(KeyError):
+        tone.parse_results('[{"image": 1, "tone": "Positive", "strength": 1, "quality": 1}]', 2)
+    with pytest.raises(ValueError):
+        tone.parse_results('[{"image": 1, "tone": "Angry", "strength": 1, "quality": 1}]', 1)
+
+
+def test_classifier_batches_images_and_uploads_samples_once(images):
+    model = tone.MockModel(tone="Positive", strength=80, quality=70)
+    tones = classifier(model, batch_size=5)
+
+    results = tones.classify(images)
+    assert results == [{"tone": "Positive", "strength": 80, "quality": 70}] * 12
+    assert (model.requests, model.images, model.uploads) == (3, 12, 3)
+
+    tones.classify(images[:2])
+    assert model.uploads == 3  # Samples are not uploaded again
+
+
+def test_classifier_retries_malformed_batch_one_image_at_a_time(images):
+    class SkipsImages(tone.MockModel):
+        def generate(self, parts):
+            answer = json.loads(super().generate(parts))
+            return json.dumps(answer[:1])  # Only ever answers for the first image
+
+    model = SkipsImages()
+    results = classifier(model, batch_size=3).classify(images[:3])
+    assert len(results) == 3
+    assert model.requests == 4  # Failed batch, then one request per image
+
+
+def test_detector_format_is_unchanged(images):
+    assert tone.format_result({"tone": "Neutral", "strength": 95, "quality": 90}) == "Neutral, 95, 90"
+
+
+def test_cache_only_classifies_new_images(images, tmp_path):
+    cache = tone_cache.ToneCache(str(tmp_path / "tones.db"))
+    first = tone.MockModel()
+    classifier(first, cache=cache).classify(images[:7])
+    assert first.images == 7
+
+    second = tone.MockModel(tone="Positive")
+    results = classifier(second, cache=cache).classify(images)
+    assert second.images == 5  # Only the five new images reach the model
+    assert results[0]["tone"] == "Neutral" and results[-1]["tone"] == "Positive"
+
+
+def test_cache_is_keyed_by_model_and_prompt_version(images, tmp_path):
+    cache = tone_cache.ToneCache(str(tmp_path / "tones.db"))
+    classifier(tone.MockModel(), cache=cache).classify(images[:2])
+
+    other = tone.MockModel()
+    other.name = "other-model"
+    classifier(other, cache=cache).classify(images[:2])
+    assert other.images == 2
+    assert cache.get_many([], tone.PROMPT_VERSION + 1, "mock") == {}
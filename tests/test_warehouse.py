@@ -0,0 +1,156 @@
+"""Round trips through the Parquet shot warehouse"""
+
+import pandas as pd
+import pytest
+import requests
+
+import warehouse
+
+
+def shots(match_id, rows):
+    return pd.DataFrame([
+        {"match_id": match_id, "player_id": player_id, "player_name": name, "is_home": True,
+         "shot_type": shot_type, "situation": situation, "body_part": "right-foot",
+         "x": 10.0, "y": 50.0, "xg": xg}
+        for player_id, name, shot_type, situation, xg in rows
+    ])
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    directory = str(tmp_path / "warehouse")
+    warehouse.write_shots(shots(2, [(1, "Mohamed Salah", "goal", "regular", 0.5),
+                                     (2, "Cody Gakpo", "miss", "assisted", 0.1)]),
+                          "Premier League 24/25", directory)
+    warehouse.write_shots(shots(1, [(1, "Mohamed Salah", "save", "penalty", 0.79),
+                                     (1, "Mohamed Salah", "miss", "corner", 0.05)]),
+                          "Premier League 24/25", directory)
+    warehouse.write_shots(shots(9, [(1, "Mohamed Salah", "goal", "regular", 0.3)]),
+                          "Premier League 23/24", directory)
+    return directory
+
+
+def test_season_shots_follow_match_order(data_dir):
+    data = warehouse.season_shots("Mohamed Salah", "Premier League 24/25", [1, 2], data_dir)
+    assert list(data["xg"]) == [0.79, 0.05, 0.5]
+    assert list(data.columns) == ["shot_type", "situation", "body_part", "x", "y", "xg"]
+    assert data["shot_type"].dtype == "category"
+
+    only_second = warehouse.season_shots("Mohamed Salah", "Premier League 24/25", [2], data_dir)
+    assert list(only_second["xg"]) == [0.5]
+
+
+def test_partitions_keep_seasons_apart(data_dir):
+    assert warehouse.stored_match_ids("Premier League 24/25", data_dir) == {1, 2}
+    assert warehouse.stored_match_ids("Premier League 23/24", data_dir) == {9}
+    assert warehouse.stored_match_ids("LaLiga 24/25", data_dir) == set()
+
+
+def test_player_totals_skip_penalties(data_dir):
+    totals = warehouse.player_totals("Premier League 24/25", data_dir)
+    salah = totals.loc["Mohamed Salah"]
+    assert (salah["shots"], salah["goals"]) == (2, 1)
+    assert salah["xg"] == pytest.approx(0.55)
+
+
+def test_empty_warehouse(tmp_path):
+    directory = str(tmp_path / "missing")
+    assert warehouse.stored_match_ids("Premier League 24/25", directory) == set()
+    assert warehouse.season_shots("Mohamed Salah", "Premier League 24/25", None, directory).empty
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """Serves match shotmaps slowly (so callers overlap) and counts downloads"""
+    import threading
+    import time
+    import shot_store
+    import shotmap
+    import sofascore
+
+    served = {10: [{"player": {"id": 1, "name": "Mohamed Salah"}, "isHome": True, "shotType": "goal",
+                    "situation": "regular", "bodyPart": "left-foot",
+                    "playerCoordinates": {"x": 10.0, "y": 50.0}, "xg": 0.4}],
+              11: []}  # Played, but no shots
+    downloads = []
+    lock = threading.Lock()
+
+    def get_match_shotmap(match_id, session=None):
+        time.sleep(0.05)
+        with lock:
+            downloads.append(match_id)
+        return served[match_id]
+
+    monkeypatch.setattr(shotmap, "get_match_shotmap", get_match_shotmap)
+    monkeypatch.setattr(sofascore, "get_session", lambda: None)
+    monkeypatch.setattr(shot_store, "default_store", shot_store.ShotStore)  # Fresh store per call
+    return downloads
+
+
+def test_concurrent_callers_store_each_match_once(tmp_path, fetched):
+    from concurrent.futures import ThreadPoolExecutor
+
+    directory = str(tmp_path / "warehouse")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        added = list(executor.map(
+            lambda _: warehouse.ensure_matches("Premier League 24/25", [10, 11], data_dir=directory), range(4)
+        ))
+    assert sorted(added) == [0, 0, 0, 2]
+    assert len(warehouse.season_shots("Mohamed Salah", "Premier League 24/25", None, directory)) == 1
+
+
+def test_matches_without_shots_are_not_fetched_again(tmp_path, fetched):
+    directory = str(tmp_path / "warehouse")
+    assert warehouse.ensure_matches("Premier League 24/25", [10, 11], data_dir=directory) == 2
+    assert warehouse.stored_match_ids("Premier League 24/25", directory) == {10, 11}
+    assert warehouse.ensure_matches("Premier League 24/25", [11], data_dir=directory) == 0
+    assert sorted(fetched) == [10, 11]
+
+
+def test_raw_values_persist_and_read_back_as_other(tmp_path):
+    directory = str(tmp_path / "warehouse")
+    warehouse.write_shots(shots(3, [(1, "Mohamed Salah", "goal", "rebound", 0.2)]), "Premier League 24/25", directory)
+    raw = warehouse.open_dataset(directory).to_table(columns=["situation"]).column("situation").to_pylist()
+    assert raw == ["rebound"]
+    data = warehouse.season_shots("Mohamed Salah", "Premier League 24/25", None, directory)
+    assert list(data["situation"]) == ["other"]
+
+
+def test_matches_that_downloaded_are_stored_when_others_fail(tmp_path, fetched, monkeypatch):
+    import shotmap
+    import shot_store
+
+    get_match_shotmap = shotmap.get_match_shotmap
+
+    def flaky(match_id, session=None):
+        if match_id == 12:
+            raise requests.HTTPError("503 Server Error")
+        return get_match_shotmap(match_id, session)
+
+    monkeypatch.setattr(shotmap, "get_match_shotmap", flaky)
+    directory = str(tmp_path / "warehouse")
+    with pytest.raises(shot_store.FetchError) as failure:
+        warehouse.ensure_matches("Premier League 24/25", [10, 11, 12], data_dir=directory)
+    assert list(failure.value.errors) == [12]
+    assert warehouse.stored_match_ids("Premier League 24/25", directory) == {10, 11}
+
+
+def test_compact_merges_partition_files(data_dir):
+    import os
+
+    def files(directory):
+        return sorted(os.path.relpath(os.path.join(root, name), directory)
+                      for root, _, names in os.walk(directory) for name in names)
+
+    warehouse.write_matches({1: 2, 2: 2, 3: 0}, "Premier League 24/25", data_dir)
+    assert warehouse.compact("Premier League 24/25", data_dir) == 0  # Under COMPACT_FILES
+    before = files(data_dir)
+
+    assert warehouse.compact("Premier League 24/25", data_dir, max_files=0) == 3
+    after = files(data_dir)
+    assert len(after) == len(before) - 1  # Two shot files became one
+    assert [path for path in after if "23%2F24" in path] == [path for path in before if "23%2F24" in path]
+
+    data = warehouse.season_shots("Mohamed Salah", "Premier League 24/25", [1, 2], data_dir)
+    assert list(data["xg"]) == [0.79, 0.05, 0.5]
+    assert warehouse.stored_match_ids("Premier League 24/25", data_dir) == {1, 2, 3}